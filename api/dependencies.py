@@ -1,28 +1,48 @@
+import copy
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import Optional
-from core.database import get_db
+from datetime import datetime
+from core.config import settings
+from core.cache import principal_cache, principal_invalidator
+from core.database import get_read_db
+from core.rate_limit import check_rate_limit
 from core.security import verify_token
+from services.api_key_service import api_key_index
 from services.user_service import UserService
+from services.write_behind import write_behind
 from models.user import User, UserTier
 
-security = HTTPBearer()
+security = HTTPBearer(auto_error=False)
+api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
 async def get_current_user(
-        credentials: HTTPAuthorizationCredentials = Depends(security),
-        db: AsyncSession = Depends(get_db)
+        credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+        api_key: Optional[str] = Depends(api_key_header),
+        db: AsyncSession = Depends(get_read_db)
 ) -> User:
-    """Get current authenticated user."""
-    if not credentials:
+    """Get current authenticated user from a bearer token or an API key."""
+    if api_key:
+        user_id = await authenticate_api_key(api_key, db)
+    elif credentials:
+        user_id = authenticate_token(credentials.credentials)
+    else:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required"
         )
 
-    # Verify token
-    payload = verify_token(credentials.credentials)
+    return await resolve_principal(user_id, db)
+
+
+def authenticate_token(token: str) -> str:
+    """Verify an access token and return its user id."""
+    payload = verify_token(token)
     user_id = payload.get("sub")
 
     if not user_id:
@@ -31,6 +51,47 @@ async def get_current_user(
             detail="Invalid token"
         )
 
+    return user_id
+
+
+async def authenticate_api_key(api_key: str, db: AsyncSession) -> str:
+    """Resolve an API key through the in-memory index and apply its rate limit."""
+    entry = await api_key_index.lookup(api_key, db)
+
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+
+    await check_rate_limit(f"apikey:{entry.id}", entry.rate_limit, settings.API_KEY_RATE_LIMIT_WINDOW)
+    write_behind.record_api_key_use(entry.id, datetime.utcnow())
+
+    return str(entry.user_id)
+
+
+_PRINCIPAL_COLUMNS = [attr.key for attr in inspect(User).column_attrs]
+
+
+def _copy_principal(user: User) -> User:
+    """A detached copy of a cached user, so a handler changing it cannot alter the cache."""
+    values = {key: getattr(user, key) for key in _PRINCIPAL_COLUMNS}
+    # JSON columns are mutable containers; everything else is immutable
+    values["preferences"] = copy.deepcopy(values["preferences"])
+    # Filled in directly rather than through User(...), which costs several times more
+    principal = inspect(User).class_manager.new_instance()
+    principal.__dict__.update(values)
+    make_transient_to_detached(principal)
+    return principal
+
+
+async def resolve_principal(user_id: str, db: AsyncSession) -> User:
+    """Load an active user by id, serving from the principal cache when possible."""
+    # Serve the user from the principal cache when possible
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return _copy_principal(user)
+
     # Get user from database
     user_service = UserService(db)
     user = await user_service.get_user_by_id(user_id)
@@ -47,7 +108,16 @@ async def get_current_user(
             detail="User account is disabled"
         )
 
-    return user
+    # A login this worker has not flushed yet is newer than the stored last_login
+    pending_login = write_behind.pending_login(user.id)
+    if pending_login is not None:
+        set_committed_value(user, "last_login", pending_login)
+
+    # Detach so the cached instance is never mutated by this request's session
+    db.expunge(user)
+    principal_cache.set(user_id, user, ttl=principal_invalidator.ttl)
+
+    return _copy_principal(user)
 
 
 async def get_current_active_user(
@@ -77,3 +147,18 @@ def require_tier(required_tier: UserTier):
         return current_user
 
     return tier_dependency
+
+
+_admin_emails = {email.lower() for email in settings.ADMIN_EMAILS}
+
+
+async def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+    """Dependency to require an administrator."""
+    # Registration does not prove the address is owned, so only a verified email counts
+    if not current_user.email_verified or current_user.email.lower() not in _admin_emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required"
+        )
+
+    return current_user
@@ -0,0 +1,66 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.database import get_db
+from api.dependencies import require_admin
+from services.user_service import UserService
+from services.export_service import (
+    ExportFormat, MEDIA_TYPES, stream_export, subscription_export_query, user_export_query
+)
+from schemas.user import BulkUserCreate, BulkUserResponse
+from models.user import User, UserSubscription, UserTier, SubscriptionStatus
+
+router = APIRouter()
+
+
+@router.post("/users/bulk", response_model=BulkUserResponse)
+async def bulk_register_users(
+        bulk_data: BulkUserCreate,
+        admin: User = Depends(require_admin),
+        db: AsyncSession = Depends(get_db)
+):
+    """Register a batch of users, reporting success or failure per row."""
+    user_service = UserService(db)
+    results = await user_service.bulk_create_users(bulk_data.users)
+    created = sum(1 for result in results if result["status"] == "created")
+
+    return ORJSONResponse({"created": created, "failed": len(results) - created, "results": results})
+
+
+def _export_response(stmt, key_column, name: str, export_format: ExportFormat) -> StreamingResponse:
+    filename = f"{name}-{datetime.utcnow():%Y%m%dT%H%M%SZ}.{export_format.value}"
+    return StreamingResponse(
+        stream_export(stmt, key_column, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/export/users")
+async def export_users(
+        export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+        tier: Optional[UserTier] = None,
+        is_active: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        admin: User = Depends(require_admin)
+):
+    """Stream all users matching the filters as NDJSON or CSV."""
+    stmt = user_export_query(tier, is_active, created_after, created_before)
+    return _export_response(stmt, User.id, "users", export_format)
+
+
+@router.get("/export/subscriptions")
+async def export_subscriptions(
+        export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+        tier: Optional[UserTier] = None,
+        subscription_status: Optional[SubscriptionStatus] = Query(None, alias="status"),
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        admin: User = Depends(require_admin)
+):
+    """Stream all subscriptions matching the filters as NDJSON or CSV."""
+    stmt = subscription_export_query(tier, subscription_status, created_after, created_before)
+    return _export_response(stmt, UserSubscription.id, "subscriptions", export_format)
@@ -0,0 +1,130 @@
+from typing import List, Optional
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from starlette.concurrency import run_in_threadpool
+from core.config import settings
+from api.dependencies import require_tier
+from api.v1.market import numpy_response, parse_timeframe
+from services.analytics import indicators
+from services.analytics.correlation import correlation_service
+from services.analytics.macro import currency_strength
+from services.analytics.prices import PriceMatrix, load_prices
+from services.market_data.candles import candle_store
+from services.market_data.pairs import ALL_PAIRS, MAJORS
+from models.user import User, UserTier
+
+router = APIRouter()
+
+
+def _pairs(pairs: Optional[List[str]]) -> List[str]:
+    if not pairs:
+        return list(MAJORS)
+    unknown = sorted(set(pairs) - set(ALL_PAIRS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown pairs: {', '.join(unknown)}"
+        )
+    return list(dict.fromkeys(pairs))
+
+
+def _require_candles(prices: PriceMatrix) -> PriceMatrix:
+    if not prices.ts.size:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No candles stored for the requested pairs"
+        )
+    return prices
+
+
+def _compute_indicators(pairs: List[str], timeframe: str, names: List[str],
+                        period: Optional[int], bars: int) -> dict:
+    warmup = indicators.warmup_bars(names, period)
+    prices = _require_candles(load_prices(candle_store, pairs, timeframe, bars + warmup))
+    values = indicators.compute(names, prices.high, prices.low, prices.close, period)
+    return {
+        "timeframe": timeframe,
+        "pairs": prices.pairs,
+        "stale": prices.stale,
+        "ts": prices.ts[-bars:],
+        "close": prices.close[:, -bars:].astype(np.float32),
+        "indicators": {name: np.ascontiguousarray(series[:, -bars:]) for name, series in values.items()},
+    }
+
+
+def _compute_strength(timeframe: str, bars: int) -> dict:
+    prices = _require_candles(load_prices(candle_store, ALL_PAIRS, timeframe, bars))
+    currencies, strength = currency_strength(prices.pairs, indicators.returns(prices.close))
+    return {
+        "timeframe": timeframe,
+        "pairs": prices.pairs,
+        "stale": prices.stale,
+        "ts": prices.ts,
+        "currencies": currencies,
+        "strength": strength,
+    }
+
+
+@router.get("/indicators")
+async def get_indicators(
+        pairs: Optional[List[str]] = Query(None, description="defaults to the majors"),
+        indicator: List[str] = Query(["sma", "rsi", "macd"]),
+        timeframe: str = "H1",
+        period: Optional[int] = Query(None, ge=2, le=500),
+        bars: int = Query(200, ge=1, le=settings.CANDLE_QUERY_MAX_ROWS),
+        current_user: User = Depends(require_tier(UserTier.BASIC))
+):
+    """Compute technical indicators for several pairs on shared timestamps."""
+    unknown = sorted(set(indicator) - set(indicators.INDICATORS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown indicators: {', '.join(unknown)}"
+        )
+
+    payload = await run_in_threadpool(
+        _compute_indicators, _pairs(pairs), parse_timeframe(timeframe), list(dict.fromkeys(indicator)), period, bars
+    )
+    return numpy_response(payload)
+
+
+@router.get("/strength")
+async def get_currency_strength(
+        timeframe: str = "H4",
+        bars: int = Query(120, ge=2, le=settings.CANDLE_QUERY_MAX_ROWS),
+        current_user: User = Depends(require_tier(UserTier.PRO))
+):
+    """Relative strength of each currency across all stored pairs."""
+    payload = await run_in_threadpool(_compute_strength, parse_timeframe(timeframe), bars)
+    return numpy_response(payload)
+
+
+@router.get("/correlation")
+async def get_correlation(
+        pairs: Optional[List[str]] = Query(None, description="defaults to every stored pair"),
+        current_user: User = Depends(require_tier(UserTier.PRO))
+):
+    """Rolling correlation of log returns between pairs, updated as bars close."""
+    snapshot = await correlation_service.snapshot()
+    if not snapshot.count:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not enough candles stored to correlate"
+        )
+
+    selected = snapshot.pairs
+    matrix = snapshot.matrix
+    if pairs:
+        selected = [pair for pair in _pairs(pairs) if pair in snapshot.pairs]
+        index = [snapshot.pairs.index(pair) for pair in selected]
+        matrix = np.ascontiguousarray(matrix[np.ix_(index, index)])
+
+    return numpy_response({
+        "timeframe": snapshot.timeframe,
+        "window": snapshot.window,
+        "bars": snapshot.count,
+        "ts": snapshot.ts,
+        "pairs": selected,
+        "stale": snapshot.stale,
+        "matrix": matrix,
+    })
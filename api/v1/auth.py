@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from core.database import get_db
+from core.database import get_db, get_read_db
 from core.security import create_access_token, create_refresh_token, verify_token
 from services.user_service import UserService
 from schemas.user import (
     UserCreate, UserResponse, LoginRequest, LoginResponse,
-    RefreshTokenRequest, TokenResponse
+    RefreshTokenRequest, TokenResponse, serialize_user, serialize_login
 )
 
 router = APIRouter()
@@ -19,7 +20,7 @@ async def register(
     """Register a new user."""
     user_service = UserService(db)
     user = await user_service.create_user(user_data)
-    return user
+    return ORJSONResponse(serialize_user(user), status_code=status.HTTP_201_CREATED)
 
 
 @router.post("/login", response_model=LoginResponse)
@@ -41,17 +42,13 @@ async def login(
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
 
-    return LoginResponse(
-        access_token=access_token,
-        refresh_token=refresh_token,
-        user=user
-    )
+    return ORJSONResponse(serialize_login(access_token, refresh_token, user))
 
 
 @router.post("/refresh", response_model=TokenResponse)
 async def refresh_token(
         refresh_data: RefreshTokenRequest,
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_read_db)
 ):
     """Refresh access token."""
     # Verify refresh token
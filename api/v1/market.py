@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from typing import Optional
+import numpy as np
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
+from starlette.concurrency import run_in_threadpool
+from core.config import settings
+from api.dependencies import get_current_active_user
+from services.market_data.candles import CANDLE_DTYPE, TIMEFRAMES, candle_store, empty_candles
+from services.market_data.pairs import ALL_PAIRS
+from models.user import User
+
+router = APIRouter()
+
+# Pairs double as directory names in the candle store, so they are strictly validated
+PAIR_PATH = Path(..., pattern="^[A-Z]{6}$")
+
+
+def _epoch(value: Optional[datetime]) -> Optional[int]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def parse_timeframe(timeframe: str) -> str:
+    if timeframe not in TIMEFRAMES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown timeframe; expected one of {', '.join(TIMEFRAMES)}"
+        )
+    return timeframe
+
+
+def numpy_response(payload: dict) -> Response:
+    """JSON response for payloads holding NumPy arrays, serialized without Python loops."""
+    return Response(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY), media_type="application/json")
+
+
+def candle_columns(rows: np.ndarray) -> dict:
+    """Candles as one array per field, which is far smaller than a list of objects."""
+    return {name: np.ascontiguousarray(rows[name]) for name in CANDLE_DTYPE.names}
+
+
+def _recent_candles(pair: str, timeframe: str, start: Optional[int], end: Optional[int], limit: int) -> np.ndarray:
+    """The last ``limit`` candles in [start, end); blocking, so it runs in the threadpool."""
+    if start is None:
+        # Read only the tail rather than resampling the pair's whole M1 history
+        start = candle_store.tail_start(pair, timeframe, limit, end)
+        if start is None:
+            return empty_candles()
+    return candle_store.query(pair, timeframe, start, end)[-limit:]
+
+
+@router.get("/pairs")
+async def get_pairs(current_user: User = Depends(get_current_active_user)):
+    """List supported currency pairs and timeframes."""
+    return {"pairs": list(ALL_PAIRS), "stored": candle_store.pairs(), "timeframes": list(TIMEFRAMES)}
+
+
+@router.get("/candles/{pair}")
+async def get_candles(
+        pair: str = PAIR_PATH,
+        timeframe: str = "H1",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = Query(1000, ge=1, le=settings.CANDLE_QUERY_MAX_ROWS),
+        current_user: User = Depends(get_current_active_user)
+):
+    """Get OHLC candles for a pair, most recent ``limit`` bars within the range."""
+    rows = await run_in_threadpool(
+        _recent_candles, pair, parse_timeframe(timeframe), _epoch(start), _epoch(end), limit
+    )
+    return numpy_response({"pair": pair, "timeframe": timeframe, **candle_columns(rows)})
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from core.config import settings
+from api.dependencies import require_tier
+from api.v1.market import PAIR_PATH
+from services.market_data.pairs import ALL_PAIRS
+from services.prediction.service import prediction_service
+from models.user import User, UserTier
+
+router = APIRouter()
+
+
+@router.get("/{pair}")
+async def get_prediction(
+        pair: str = PAIR_PATH,
+        horizon: int = Query(1, ge=1, le=settings.PREDICTION_MAX_HORIZON, description="bars ahead"),
+        current_user: User = Depends(require_tier(UserTier.BASIC))
+):
+    """Predict a pair's close ``horizon`` bars after the last closed bar."""
+    if not prediction_service.available:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Predictions are unavailable: no trained model is configured"
+        )
+    if pair not in ALL_PAIRS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown pair")
+    if horizon > prediction_service.max_horizon:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The model predicts at most {prediction_service.max_horizon} bars ahead"
+        )
+
+    prediction = await prediction_service.predict(pair, horizon)
+    if prediction is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Not enough candles stored to predict this pair"
+        )
+    return ORJSONResponse(prediction._asdict())
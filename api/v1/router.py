@@ -1,7 +1,11 @@
 from fastapi import APIRouter
-from api.v1 import auth, users
+from api.v1 import admin, analytics, auth, market, predictions, users
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-api_router.include_router(users.router, prefix="/users", tags=["Users"])
\ No newline at end of file
+api_router.include_router(users.router, prefix="/users", tags=["Users"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
+api_router.include_router(market.router, prefix="/market", tags=["Market Data"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+api_router.include_router(predictions.router, prefix="/predictions", tags=["Predictions"])
\ No newline at end of file
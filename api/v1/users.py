@@ -1,24 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from core.database import get_db
+from uuid import UUID
+from core.database import get_db, get_read_db
+from core.etag import etag_matches, not_modified, set_etag, weak_etag
 from api.dependencies import get_current_active_user
 from services.user_service import UserService
+from services.api_key_service import APIKeyService
 from schemas.user import (
     UserResponse, UserUpdate, SubscriptionCreate,
-    SubscriptionResponse, SubscriptionUpdate
+    SubscriptionResponse, SubscriptionUpdate,
+    APIKeyCreate, APIKeyResponse, APIKeyCreatedResponse,
+    serialize_user, serialize_subscription, serialize_api_key
 )
 from models.user import User
 
 router = APIRouter()
 
 
+def _user_etag(user: User) -> str:
+    return weak_etag("user", user.id, user.version, user.last_login)
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
+        request: Request,
         current_user: User = Depends(get_current_active_user)
 ):
     """Get current user information."""
-    return current_user
+    # Answered from the principal cache; nothing is serialized on a match
+    etag = _user_etag(current_user)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return set_etag(ORJSONResponse(serialize_user(current_user)), etag)
 
 
 @router.patch("/me", response_model=UserResponse)
@@ -30,7 +45,7 @@ async def update_current_user(
     """Update current user information."""
     user_service = UserService(db)
     updated_user = await user_service.update_user(str(current_user.id), user_update)
-    return updated_user
+    return set_etag(ORJSONResponse(serialize_user(updated_user)), _user_etag(updated_user))
 
 
 @router.post("/me/subscriptions", response_model=SubscriptionResponse, status_code=status.HTTP_201_CREATED)
@@ -42,24 +57,33 @@ async def create_subscription(
     """Create a new subscription for current user."""
     user_service = UserService(db)
     subscription = await user_service.create_subscription(str(current_user.id), subscription_data)
-    return subscription
+    return ORJSONResponse(serialize_subscription(subscription), status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/me/subscriptions", response_model=List[SubscriptionResponse])
 async def get_user_subscriptions(
+        request: Request,
         current_user: User = Depends(get_current_active_user),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_read_db)
 ):
     """Get all subscriptions for current user."""
     user_service = UserService(db)
+
+    # One aggregate query decides freshness before any rows are loaded
+    fingerprint = await user_service.get_subscriptions_fingerprint(str(current_user.id))
+    etag = weak_etag("subscriptions", current_user.id, *fingerprint)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     subscriptions = await user_service.get_user_subscriptions(str(current_user.id))
-    return subscriptions
+    return set_etag(ORJSONResponse([serialize_subscription(subscription) for subscription in subscriptions]), etag)
 
 
 @router.get("/me/subscription/active", response_model=SubscriptionResponse)
 async def get_active_subscription(
+        request: Request,
         current_user: User = Depends(get_current_active_user),
-        db: AsyncSession = Depends(get_db)
+        db: AsyncSession = Depends(get_read_db)
 ):
     """Get active subscription for current user."""
     user_service = UserService(db)
@@ -71,4 +95,41 @@ async def get_active_subscription(
             detail="No active subscription found"
         )
 
-    return subscription
+    etag = weak_etag("subscription", subscription.id, subscription.version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return set_etag(ORJSONResponse(serialize_subscription(subscription)), etag)
+
+
+@router.post("/me/api-keys", response_model=APIKeyCreatedResponse, status_code=status.HTTP_201_CREATED)
+async def create_api_key(
+        key_data: APIKeyCreate,
+        current_user: User = Depends(get_current_active_user),
+        db: AsyncSession = Depends(get_db)
+):
+    """Create an API key for current user. The key is only shown once."""
+    api_key_service = APIKeyService(db)
+    key, plaintext = await api_key_service.create_api_key(current_user.id, key_data)
+    return ORJSONResponse({**serialize_api_key(key), "api_key": plaintext}, status_code=status.HTTP_201_CREATED)
+
+
+@router.get("/me/api-keys", response_model=List[APIKeyResponse])
+async def get_api_keys(
+        current_user: User = Depends(get_current_active_user),
+        db: AsyncSession = Depends(get_db)
+):
+    """Get all API keys for current user."""
+    api_key_service = APIKeyService(db)
+    keys = await api_key_service.get_user_api_keys(current_user.id)
+    return ORJSONResponse([serialize_api_key(key) for key in keys])
+
+
+@router.delete("/me/api-keys/{key_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_api_key(
+        key_id: UUID,
+        current_user: User = Depends(get_current_active_user),
+        db: AsyncSession = Depends(get_db)
+):
+    """Revoke one of current user's API keys."""
+    api_key_service = APIKeyService(db)
+    await api_key_service.revoke_api_key(current_user.id, key_id)
@@ -0,0 +1,244 @@
+"""Load and latency benchmark for every API endpoint.
+
+Drives ``main.app`` in-process over ASGI against a throwaway SQLite database
+(or ``--database-url``), runs each scenario at a fixed concurrency and reports
+throughput and p50/p95/p99. Results can be saved as JSON and compared against
+a stored baseline; the run exits non-zero when a scenario regresses by more
+than ``--max-regression``.
+
+    python -m benchmarks.bench_api --requests 500 --concurrency 16 --output results.json
+    python -m benchmarks.bench_api --baseline results.json --max-regression 0.25
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+SCENARIOS = (
+    "register",
+    "login",
+    "refresh",
+    "me_get",
+    "me_patch",
+    "subscription_create",
+    "subscriptions_list",
+    "subscription_active",
+)
+
+PASSWORD = "Benchmark123"
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Point the app at the benchmark database before it is imported."""
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="fx-compass-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    os.environ["PASSWORD_HASH_ROUNDS"] = str(args.hash_rounds)
+    os.environ.setdefault("RATE_LIMIT_REQUESTS", "1000000000")
+    os.environ.setdefault("LOG_SAMPLE_RATE", "0")
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+
+class Session:
+    """A registered benchmark user and its tokens."""
+
+    def __init__(self, email: str, access_token: str, refresh_token: str):
+        self.email = email
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+def new_user_payload() -> dict:
+    suffix = uuid.uuid4().hex[:12]
+    return {"email": f"bench-{suffix}@example.com", "username": f"bench_{suffix}", "password": PASSWORD}
+
+
+async def create_session(client) -> Session:
+    payload = new_user_payload()
+    response = await client.post("/api/v1/auth/register", json=payload)
+    response.raise_for_status()
+    response = await client.post("/api/v1/auth/login", json={"email": payload["email"], "password": PASSWORD})
+    response.raise_for_status()
+    data = response.json()
+    return Session(payload["email"], data["access_token"], data["refresh_token"])
+
+
+def build_scenarios(client, sessions: List[Session]) -> Dict[str, Callable[[int], Awaitable[int]]]:
+    """Map scenario names to request coroutines taking a request index."""
+
+    def session_for(i: int) -> Session:
+        return sessions[i % len(sessions)]
+
+    async def register(i: int) -> int:
+        return (await client.post("/api/v1/auth/register", json=new_user_payload())).status_code
+
+    async def login(i: int) -> int:
+        body = {"email": session_for(i).email, "password": PASSWORD}
+        return (await client.post("/api/v1/auth/login", json=body)).status_code
+
+    async def refresh(i: int) -> int:
+        body = {"refresh_token": session_for(i).refresh_token}
+        return (await client.post("/api/v1/auth/refresh", json=body)).status_code
+
+    async def me_get(i: int) -> int:
+        return (await client.get("/api/v1/users/me", headers=session_for(i).headers)).status_code
+
+    async def me_patch(i: int) -> int:
+        body = {"first_name": f"Bench{i}", "preferences": {"theme": "dark", "n": i}}
+        return (await client.patch("/api/v1/users/me", json=body, headers=session_for(i).headers)).status_code
+
+    async def subscription_create(i: int) -> int:
+        body = {"tier": "pro", "auto_renew": True}
+        return (await client.post("/api/v1/users/me/subscriptions", json=body, headers=session_for(i).headers)).status_code
+
+    async def subscriptions_list(i: int) -> int:
+        return (await client.get("/api/v1/users/me/subscriptions", headers=session_for(i).headers)).status_code
+
+    async def subscription_active(i: int) -> int:
+        return (await client.get("/api/v1/users/me/subscription/active", headers=session_for(i).headers)).status_code
+
+    return {
+        "register": register,
+        "login": login,
+        "refresh": refresh,
+        "me_get": me_get,
+        "me_patch": me_patch,
+        "subscription_create": subscription_create,
+        "subscriptions_list": subscriptions_list,
+        "subscription_active": subscription_active,
+    }
+
+
+async def run_scenario(request: Callable[[int], Awaitable[int]], requests: int, concurrency: int) -> dict:
+    from benchmarks.common import summarize
+
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            start = time.perf_counter()
+            status_code = await request(i)
+            latencies.append(time.perf_counter() - start)
+            if status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+
+    result = summarize(latencies)
+    result["errors"] = errors
+    result["requests_per_sec"] = len(latencies) / elapsed if elapsed else 0.0
+    return result
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], max_regression: float) -> List[str]:
+    """List scenarios whose p95 latency or throughput regressed beyond the threshold."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + max_regression):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.2f}ms -> {current['p95_ms']:.2f}ms")
+        if previous["requests_per_sec"] and current["requests_per_sec"] < previous["requests_per_sec"] * (1 - max_regression):
+            regressions.append(
+                f"{name}: throughput {previous['requests_per_sec']:.1f}/s -> {current['requests_per_sec']:.1f}/s"
+            )
+        if current["errors"] > previous.get("errors", 0):
+            regressions.append(f"{name}: errors {previous.get('errors', 0)} -> {current['errors']}")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict:
+    import httpx
+    from main import app
+
+    scenarios = args.scenarios or list(SCENARIOS)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            sessions = [await create_session(client) for _ in range(args.users)]
+            requests = build_scenarios(client, sessions)
+
+            results = {}
+            for name in scenarios:
+                # Warm up caches and connections outside the measured run
+                await run_scenario(requests[name], min(args.concurrency, args.requests), args.concurrency)
+                results[name] = await run_scenario(requests[name], args.requests, args.concurrency)
+                print(
+                    f"{name:22} {results[name]['requests_per_sec']:9.1f} req/s  "
+                    f"p50 {results[name]['p50_ms']:7.2f}ms  p95 {results[name]['p95_ms']:7.2f}ms  "
+                    f"p99 {results[name]['p99_ms']:7.2f}ms  errors {results[name]['errors']}",
+                    file=sys.stderr
+                )
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "database": os.environ["DATABASE_URL"].split("://", 1)[0],
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "hash_rounds": args.hash_rounds,
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=20, help="users created for authenticated scenarios")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS)
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite database")
+    parser.add_argument("--hash-rounds", type=int, default=4, help="bcrypt rounds; production uses PASSWORD_HASH_ROUNDS")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed fractional regression")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    configure_environment(args)
+    report = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(report["results"], baseline, args.max_regression)
+        if regressions:
+            print("Regressions beyond threshold:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
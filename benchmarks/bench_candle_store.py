@@ -0,0 +1,130 @@
+"""Benchmark the memory-mapped candle store.
+
+Writes synthetic M1 history for many pairs, then measures range queries
+(binary search + zero-copy slice), vectorized resampling to higher
+timeframes, and the process's resident memory while serving them.
+
+    python -m benchmarks.bench_candle_store --pairs 30 --years 1
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import List, Optional
+import numpy as np
+
+MINUTES_PER_YEAR = 365 * 24 * 60 * 5 // 7  # FX trades five days a week
+
+
+def resident_mb() -> Optional[float]:
+    """Anonymous resident memory; mapped candle pages are page cache and excluded."""
+    try:
+        with open("/proc/self/statm") as f:
+            _, resident, shared = (int(field) for field in f.read().split()[:3])
+        return (resident - shared) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+def synthetic_m1(rows: int, seed: int, start_ts: int = 1_577_836_800) -> np.ndarray:
+    from services.market_data.candles import CANDLE_DTYPE
+
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.0002, rows)))
+    open_ = np.r_[close[0], close[:-1]]
+    wiggle = np.abs(rng.normal(0, 0.0001, rows)) * close
+    candles = np.empty(rows, dtype=CANDLE_DTYPE)
+    candles["ts"] = start_ts + np.arange(rows, dtype=np.int64) * 60
+    candles["open"] = open_
+    candles["close"] = close
+    candles["high"] = np.maximum(open_, close) + wiggle
+    candles["low"] = np.minimum(open_, close) - wiggle
+    candles["volume"] = rng.integers(1, 100, rows)
+    return candles
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=30)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--queries", type=int, default=2000, help="random one-day M1 range queries")
+    parser.add_argument("--root", help="store directory; defaults to a temporary one")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    from services.market_data.candles import CandleStore, resample
+
+    root = args.root or tempfile.mkdtemp(prefix="fx-compass-candles-")
+    rows = int(MINUTES_PER_YEAR * args.years)
+    pairs = [f"P{i:05d}" for i in range(args.pairs)]
+
+    # Write
+    writer = CandleStore(root)
+    started = time.perf_counter()
+    for i, pair in enumerate(pairs):
+        writer.append(pair, synthetic_m1(rows, seed=i))
+    write_s = time.perf_counter() - started
+    del writer
+
+    # Serve from a fresh store, as another worker would
+    rss_before = resident_mb()
+    store = CandleStore(root)
+    rng = np.random.default_rng(0)
+    first_ts = 1_577_836_800
+    last_ts = first_ts + rows * 60
+
+    started = time.perf_counter()
+    returned = 0
+    for _ in range(args.queries):
+        pair = pairs[rng.integers(len(pairs))]
+        start = int(rng.integers(first_ts, last_ts - 86400))
+        returned += len(store.query(pair, "M1", start, start + 86400))
+    query_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    h1_month = [store.query(pair, "H1", last_ts - 30 * 86400, last_ts) for pair in pairs]
+    resample_h1_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    d1_all = [store.query(pair, "D1") for pair in pairs]
+    resample_d1_s = time.perf_counter() - started
+    rss_after = resident_mb()
+
+    # Resampling must agree with a straightforward per-bucket computation
+    sample = store.query(pairs[0], "M1", first_ts, first_ts + 86400)
+    h1 = resample(sample, "H1")
+    hour = sample[sample["ts"] < first_ts + 3600]
+    assert h1["open"][0] == hour["open"][0] and h1["close"][0] == hour["close"][-1]
+    assert h1["high"][0] == hour["high"].max() and h1["low"][0] == hour["low"].min()
+
+    report = {
+        "pairs": args.pairs,
+        "rows_per_pair": rows,
+        "disk_mb": args.pairs * rows * sample.dtype.itemsize / 2 ** 20,
+        "write_rows_per_sec": args.pairs * rows / write_s,
+        "m1_day_query_us": query_s / args.queries * 1e6,
+        "m1_rows_returned": returned,
+        "h1_month_resample_ms_per_pair": resample_h1_s / len(pairs) * 1000,
+        "d1_full_history_resample_ms_per_pair": resample_d1_s / len(pairs) * 1000,
+        "h1_bars": int(sum(len(bars) for bars in h1_month)),
+        "d1_bars": int(sum(len(bars) for bars in d1_all)),
+        "rss_mb_before_serving": rss_before,
+        "rss_mb_after_serving": rss_after,
+    }
+    print(
+        f"{args.pairs} pairs x {rows} M1 rows ({report['disk_mb']:.0f} MB): "
+        f"day query {report['m1_day_query_us']:.0f}us, "
+        f"H1 month {report['h1_month_resample_ms_per_pair']:.2f}ms, "
+        f"D1 history {report['d1_full_history_resample_ms_per_pair']:.1f}ms per pair, "
+        f"RSS {rss_before:.0f} -> {rss_after:.0f} MB",
+        file=sys.stderr
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
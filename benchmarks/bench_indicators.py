@@ -0,0 +1,114 @@
+"""Benchmark the vectorized indicator engine.
+
+Computes every indicator for a (pairs, bars) batch of synthetic prices in
+one call per indicator and reports the best of several rounds. Before
+timing, each recursive indicator is checked against a plain per-bar loop
+on a slice of the data.
+
+    python -m benchmarks.bench_indicators --pairs 30 --bars 100000
+"""
+import argparse
+import json
+import sys
+import time
+from typing import List, Optional
+import numpy as np
+
+
+def synthetic_prices(pairs: int, bars: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 2e-4, (pairs, bars)), axis=1))
+    wiggle = np.abs(rng.normal(0, 1e-4, (pairs, bars)))
+    return close * (1 + wiggle), close * (1 - wiggle), close
+
+
+def reference_ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    result = np.empty_like(values)
+    result[0] = values[0]
+    for t in range(1, len(values)):
+        result[t] = alpha * values[t] + (1 - alpha) * result[t - 1]
+    return result
+
+
+def reference_rsi(close: np.ndarray, period: int) -> np.ndarray:
+    delta = np.diff(close)
+    gains, losses = np.maximum(delta, 0), np.maximum(-delta, 0)
+    gain, loss = gains[:period].mean(), losses[:period].mean()
+    result = [100 - 100 / (1 + gain / loss)]
+    for t in range(period, len(delta)):
+        gain = (gain * (period - 1) + gains[t]) / period
+        loss = (loss * (period - 1) + losses[t]) / period
+        result.append(100 - 100 / (1 + gain / loss))
+    return np.array(result)
+
+
+def check(high: np.ndarray, low: np.ndarray, close: np.ndarray, bars: int = 5000) -> None:
+    from services.analytics import indicators
+
+    high, low, close = high[:2, :bars], low[:2, :bars], close[:2, :bars]
+    period = 14
+    alpha = 2 / (period + 1)
+    np.testing.assert_allclose(indicators.ema(close, period)[1, period - 1:],
+                               reference_ewm(close[1], alpha)[period - 1:], rtol=1e-12)
+    np.testing.assert_allclose(indicators.sma(close, period)[0, period - 1:],
+                               np.convolve(close[0], np.ones(period) / period, "valid"), rtol=1e-12)
+    np.testing.assert_allclose(indicators.rsi(close, period)[0, period:], reference_rsi(close[0], period), rtol=1e-9)
+
+    windows = np.lib.stride_tricks.sliding_window_view(close[0], period)
+    np.testing.assert_allclose(indicators.rolling_std(close, period)[0, period - 1:],
+                               windows.std(axis=1, ddof=1), rtol=1e-6)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=30)
+    parser.add_argument("--bars", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    from services.analytics import indicators
+    from services.analytics.macro import currency_strength
+    from services.market_data.pairs import ALL_PAIRS
+
+    high, low, close = synthetic_prices(args.pairs, args.bars)
+    check(high, low, close)
+
+    timings = {}
+    for name in indicators.INDICATORS:
+        best = float("inf")
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            indicators.compute([name], high, low, close)
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best * 1000
+
+    best = float("inf")
+    for _ in range(args.rounds):
+        started = time.perf_counter()
+        indicators.compute(indicators.INDICATORS, high, low, close)
+        best = min(best, time.perf_counter() - started)
+    total_ms = best * 1000
+
+    strength_close = synthetic_prices(len(ALL_PAIRS), args.bars, seed=1)[2]
+    started = time.perf_counter()
+    currency_strength(ALL_PAIRS, indicators.returns(strength_close))
+    strength_ms = (time.perf_counter() - started) * 1000
+
+    for name, elapsed in timings.items():
+        print(f"{name:12} {elapsed:8.1f}ms", file=sys.stderr)
+    print(f"{'all':12} {total_ms:8.1f}ms for {args.pairs} pairs x {args.bars} bars", file=sys.stderr)
+    print(f"{'strength':12} {strength_ms:8.1f}ms for {len(ALL_PAIRS)} pairs", file=sys.stderr)
+    print(json.dumps({
+        "pairs": args.pairs,
+        "bars": args.bars,
+        "indicator_ms": timings,
+        "all_indicators_ms": total_ms,
+        "currency_strength_ms": strength_ms,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
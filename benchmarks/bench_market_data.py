@@ -0,0 +1,108 @@
+"""Exercise market-data ingestion against the local stub provider.
+
+Polls every major and cross from each provider for ``--duration`` seconds
+through the real client stack (pooled httpx client, per-provider budgets,
+coalescing, retries) with the stub enforcing the same quotas, then reports
+requests sent, requests the stub rejected, and poll latency. A second phase
+fires many identical concurrent requests to show coalescing.
+
+    python -m benchmarks.bench_market_data --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of polling per provider")
+    parser.add_argument("--alpha-vantage-rpm", type=int, default=600, help="quota enforced by the stub and budgeted by the client")
+    parser.add_argument("--oanda-rpm", type=int, default=1200)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub response latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="fraction of stub responses that are 503")
+    parser.add_argument("--concurrent-callers", type=int, default=200, help="identical requests in the coalescing phase")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    import httpx
+    from benchmarks.common import summarize
+    from services.market_data.pairs import ALL_PAIRS
+    from services.market_data.providers import AlphaVantageProvider, OandaProvider
+    from services.market_data.service import MarketDataService, create_http_client
+    from services.market_data.stub_server import create_stub_app
+
+    stub = create_stub_app(args.alpha_vantage_rpm, args.oanda_rpm, args.latency, args.error_rate, seed=1)
+    client = create_http_client(transport=httpx.ASGITransport(app=stub))
+    providers = [
+        AlphaVantageProvider("http://stub", "demo", max_concurrency=2, requests_per_minute=args.alpha_vantage_rpm),
+        OandaProvider("http://stub", "demo", "101-001", max_concurrency=4, requests_per_minute=args.oanda_rpm),
+    ]
+    service = MarketDataService(providers, client=client, backoff_base=0.05, backoff_max=1.0)
+
+    results = {}
+    for provider in providers:
+        service.stats.clear()
+        stub.state.stats.clear()
+        requests_per_poll = len(provider.requests_for(list(ALL_PAIRS)))
+        interval = requests_per_poll * 60 / provider.requests_per_minute
+        latencies = []
+        quotes = 0
+        deadline = time.perf_counter() + args.duration
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            quotes += len(await service.fetch_quotes(provider.name, list(ALL_PAIRS)))
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+        results[provider.name] = {
+            "pairs": len(ALL_PAIRS),
+            "requests_per_poll": requests_per_poll,
+            "poll_interval_s": interval,
+            "polls": len(latencies),
+            "quotes": quotes,
+            "client": dict(service.stats),
+            "stub": dict(stub.state.stats),
+            "poll_latency": summarize(latencies),
+        }
+        print(
+            f"{provider.name:14} polls {len(latencies):4}  quotes {quotes:6}  "
+            f"served {stub.state.stats[provider.name + '_served']:5}  "
+            f"rejected {stub.state.stats[provider.name + '_rejected']:3}  "
+            f"retries {service.stats['retry']:3}  p95 {results[provider.name]['poll_latency']['p95_ms']:7.1f}ms",
+            file=sys.stderr
+        )
+
+    # Coalescing: many callers asking for the same pairs at the same moment
+    service.stats.clear()
+    stub.state.stats.clear()
+    await asyncio.gather(*[
+        service.fetch_quotes("oanda", list(ALL_PAIRS)) for _ in range(args.concurrent_callers)
+    ])
+    results["coalescing"] = {
+        "callers": args.concurrent_callers,
+        "upstream_requests": stub.state.stats["oanda_served"] + stub.state.stats["oanda_errors"],
+        "coalesced": service.stats["coalesced"],
+    }
+    print(
+        f"coalescing     {args.concurrent_callers} callers -> "
+        f"{results['coalescing']['upstream_requests']} upstream request(s)",
+        file=sys.stderr
+    )
+
+    await service.close()
+    return results
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
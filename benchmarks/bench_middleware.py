@@ -0,0 +1,69 @@
+"""Throughput and per-request overhead of the middleware stack in ``main.py``.
+
+Requests are driven straight through the ASGI interface (no HTTP client or
+socket), so the difference between the bare app and ``main.app`` is the cost
+of CORS, TrustedHost, Logging and RateLimit.
+
+    python -m benchmarks.bench_middleware --requests 20000 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+# Keep the benchmark itself from being rate limited
+os.environ.setdefault("RATE_LIMIT_REQUESTS", "1000000000")
+
+from fastapi import FastAPI
+
+from benchmarks.common import asgi_request
+from main import app as full_app, health_check
+
+
+def build_bare_app() -> FastAPI:
+    app = FastAPI()
+    app.add_api_route("/health", health_check, methods=["GET"])
+    return app
+
+
+async def measure(app, requests: int, concurrency: int) -> dict:
+    # Warm up so middleware stack construction is not timed
+    await asgi_request(app, path="/health")
+
+    per_worker = requests // concurrency
+
+    async def worker():
+        for _ in range(per_worker):
+            status_code = await asgi_request(app, path="/health")
+            assert status_code == 200, status_code
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    total = per_worker * concurrency
+    return {
+        "requests": total,
+        "requests_per_sec": total / elapsed,
+        "us_per_request": elapsed / total * 1e6,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    bare = await measure(build_bare_app(), args.requests, args.concurrency)
+    full = await measure(full_app, args.requests, args.concurrency)
+    report = {
+        "bare": bare,
+        "middleware_stack": full,
+        "middleware_overhead_us_per_request": full["us_per_request"] - bare["us_per_request"],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
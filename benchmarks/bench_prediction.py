@@ -0,0 +1,145 @@
+"""Benchmark micro-batched prediction serving.
+
+Drives PredictionService directly over a temporary candle store holding H1
+history for every pair. The first part sweeps the maximum batch size with
+a steady stream of concurrent, mostly distinct requests and reports
+throughput and latency; a batch size of 1 is the unbatched baseline. The
+second part replays a candle-close burst, where many users ask for the
+same few predictions at once, and reports how many model calls it took.
+
+    python -m benchmarks.bench_prediction --batch-sizes 1 8 32 128 --requests 3000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from typing import List, Optional
+import numpy as np
+
+
+def build_store(pairs: List[str], bars: int):
+    from services.market_data.candles import CANDLE_DTYPE, TIMEFRAMES, CandleStore
+
+    store = CandleStore(tempfile.mkdtemp(prefix="fx-compass-prediction-"))
+    seconds = TIMEFRAMES["H1"]
+    end = int(time.time()) // seconds * seconds
+    rng = np.random.default_rng(0)
+    for pair in pairs:
+        close = 1.1 * np.exp(np.cumsum(rng.normal(0, 1e-3, bars)))
+        candles = np.zeros(bars, dtype=CANDLE_DTYPE)
+        candles["ts"] = end - np.arange(bars, 0, -1, dtype=np.int64) * seconds
+        for field in ("open", "high", "low", "close"):
+            candles[field] = close
+        store.append(pair, candles, "H1")
+    return store
+
+
+def create_service(store, max_batch_size: int, max_wait: float, workers: int):
+    from services.prediction.model import LinearModel
+    from services.prediction.service import PredictionService
+
+    return PredictionService(store, LinearModel.baseline(24), "H1", max_batch_size, max_wait, workers)
+
+
+async def steady(service, keys: List[tuple], requests: int, concurrency: int) -> dict:
+    from benchmarks.common import summarize
+
+    latencies: List[float] = []
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < requests:
+            pair, horizon = keys[next_index % len(keys)]
+            next_index += 1
+            started = time.perf_counter()
+            if await service.predict(pair, horizon) is None:
+                raise RuntimeError(f"no prediction for {pair}")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    result = summarize(latencies)
+    result["requests_per_sec"] = len(latencies) / elapsed
+    result["batches"] = service.stats["batches"]
+    result["mean_batch_rows"] = service.stats["computed"] / max(1, service.stats["batches"])
+    result["coalesced"] = service.stats["coalesced"]
+    return result
+
+
+async def burst(service, keys: List[tuple], requests: int) -> dict:
+    started = time.perf_counter()
+    results = await asyncio.gather(*[service.predict(*keys[i % len(keys)]) for i in range(requests)])
+    elapsed = time.perf_counter() - started
+
+    # Every waiter for a key must get the same prediction
+    by_key = {}
+    for i, prediction in enumerate(results):
+        if by_key.setdefault(keys[i % len(keys)], prediction) != prediction:
+            raise AssertionError("waiters for one key got different predictions")
+
+    return {
+        "requests": requests,
+        "distinct": len(keys),
+        "model_calls": service.stats["batches"],
+        "coalesced": service.stats["coalesced"],
+        "elapsed_ms": elapsed * 1000,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=3000, help="requests per batch size")
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--max-wait", type=float, default=0.005, help="seconds")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--burst", type=int, default=5000, help="requests in the candle-close burst")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from services.market_data.pairs import ALL_PAIRS
+    from services.prediction.model import HISTORY_BARS
+
+    store = build_store(list(ALL_PAIRS), HISTORY_BARS + 10)
+    keys = [(pair, horizon) for horizon in range(1, 25) for pair in ALL_PAIRS]
+
+    results = {}
+    for size in args.batch_sizes:
+        service = create_service(store, size, args.max_wait, args.workers)
+        await steady(service, keys[:args.concurrency], args.concurrency, args.concurrency)  # warm up
+        service.stats.clear()
+        results[size] = await steady(service, keys, args.requests, args.concurrency)
+        service.shutdown()
+        print(
+            f"batch <= {size:4}: {results[size]['requests_per_sec']:8.1f} req/s  "
+            f"p50 {results[size]['p50_ms']:7.2f}ms  p99 {results[size]['p99_ms']:7.2f}ms  "
+            f"{results[size]['batches']:5} model calls, {results[size]['mean_batch_rows']:.1f} rows each",
+            file=sys.stderr
+        )
+
+    service = create_service(store, max(args.batch_sizes), args.max_wait, args.workers)
+    burst_keys = [(pair, horizon) for pair in ALL_PAIRS[:7] for horizon in (1, 4, 24)]
+    burst_result = await burst(service, burst_keys, args.burst)
+    service.shutdown()
+    print(
+        f"burst: {burst_result['requests']} requests for {burst_result['distinct']} predictions -> "
+        f"{burst_result['model_calls']} model calls in {burst_result['elapsed_ms']:.0f}ms",
+        file=sys.stderr
+    )
+
+    return {"steady": results, "burst": burst_result}
+
+
+def main() -> None:
+    args = parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Response serialization cost per endpoint: pydantic validation vs the fast path.
+
+The validated path mirrors what FastAPI does with ``response_model``:
+validate the ORM object ``from_attributes``, dump to JSON-compatible data
+and encode with stdlib ``json``. The fast path uses the precompiled
+serializers in ``schemas.user`` and orjson.
+
+    python -m benchmarks.bench_serialization --iterations 20000
+"""
+import argparse
+import json
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+
+from models.user import SubscriptionStatus, User, UserSubscription, UserTier
+from schemas.user import (
+    LoginResponse, SubscriptionResponse, UserResponse,
+    serialize_login, serialize_subscription, serialize_user
+)
+
+
+def make_user() -> User:
+    # MySQL hands back naive datetimes
+    now = datetime.utcnow()
+    return User(
+        id=uuid.uuid4(), email="trader@example.com", username="trader", password_hash="x",
+        first_name="Ada", last_name="Lovelace", tier=UserTier.PRO, is_active=True,
+        email_verified=True, created_at=now, last_login=now, timezone="UTC",
+        preferences={"theme": "dark", "pairs": ["EURUSD", "GBPUSD", "USDJPY"]}
+    )
+
+
+def make_subscription(user_id: uuid.UUID) -> UserSubscription:
+    now = datetime.utcnow()
+    return UserSubscription(
+        id=uuid.uuid4(), user_id=user_id, tier=UserTier.PRO, status=SubscriptionStatus.ACTIVE,
+        start_date=now, end_date=now + timedelta(days=30), auto_renew=True, created_at=now
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--list-size", type=int, default=10, help="subscriptions per list response")
+    args = parser.parse_args()
+
+    user = make_user()
+    subscription = make_subscription(user.id)
+    subscriptions = [make_subscription(user.id) for _ in range(args.list_size)]
+    subscription_list = TypeAdapter(List[SubscriptionResponse])
+
+    cases = {
+        "users_me": (
+            lambda: json.dumps(UserResponse.model_validate(user).model_dump(mode="json")).encode(),
+            lambda: orjson.dumps(serialize_user(user)),
+        ),
+        "auth_login": (
+            lambda: json.dumps(LoginResponse(access_token="a", refresh_token="r", user=user).model_dump(mode="json")).encode(),
+            lambda: orjson.dumps(serialize_login("a", "r", user)),
+        ),
+        "subscription_active": (
+            lambda: json.dumps(SubscriptionResponse.model_validate(subscription).model_dump(mode="json")).encode(),
+            lambda: orjson.dumps(serialize_subscription(subscription)),
+        ),
+        "subscriptions_list": (
+            lambda: json.dumps(subscription_list.dump_python(
+                subscription_list.validate_python(subscriptions, from_attributes=True), mode="json"
+            )).encode(),
+            lambda: orjson.dumps([serialize_subscription(s) for s in subscriptions]),
+        ),
+    }
+
+    report = {}
+    for name, (validated, fast) in cases.items():
+        assert json.loads(validated()) == json.loads(fast()), name
+        validated_us = timeit.timeit(validated, number=args.iterations) / args.iterations * 1e6
+        fast_us = timeit.timeit(fast, number=args.iterations) / args.iterations * 1e6
+        report[name] = {
+            "validated_us": validated_us,
+            "fast_path_us": fast_us,
+            "speedup": validated_us / fast_us,
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Measure per-worker import and boot time.
+
+Starts ``--workers`` processes at once, the way a process manager does on a
+rolling restart, and reports for each one how long ``import main`` took and
+how long the lifespan startup (schema check, caches, background tasks) took.
+The first round runs against an empty database, later rounds against a
+current schema, so the cost of the DDL path and of the version check are
+both visible.
+
+    python -m benchmarks.bench_startup --workers 4 --rounds 3
+    python -m benchmarks.bench_startup --schema-check always
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+
+def run_worker() -> None:
+    """Body of one worker process; prints its timings as JSON."""
+    start = time.perf_counter()
+    from main import app
+    imported = time.perf_counter()
+
+    async def boot() -> float:
+        async with app.router.lifespan_context(app):
+            booted = time.perf_counter()
+        return booted
+
+    booted = asyncio.run(boot())
+    print(json.dumps({
+        "pid": os.getpid(),
+        "import_ms": (imported - start) * 1000,
+        "boot_ms": (booted - imported) * 1000,
+    }))
+
+
+def run_round(workers: int, env: dict) -> List[dict]:
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--worker"],
+            env=env, stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(workers)
+    ]
+    results = []
+    for process in processes:
+        output, _ = process.communicate()
+        if process.returncode:
+            raise SystemExit(f"worker exited with {process.returncode}")
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3, help="the first round starts from an empty database")
+    parser.add_argument("--schema-check", choices=("version", "always", "off"), default="version")
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite database")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    if args.worker:
+        run_worker()
+        return
+
+    env = dict(os.environ)
+    if args.database_url:
+        env["DATABASE_URL"] = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="fx-compass-bench-"), "bench.db")
+        env["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    env["DB_SCHEMA_CHECK"] = args.schema_check
+    env.setdefault("LOG_LEVEL", "ERROR")
+
+    rounds = []
+    for number in range(args.rounds):
+        workers = run_round(args.workers, env)
+        rounds.append({"round": number + 1, "workers": workers})
+        print(
+            f"round {number + 1}: " + "  ".join(
+                f"import {w['import_ms']:6.1f}ms boot {w['boot_ms']:6.1f}ms" for w in workers
+            ),
+            file=sys.stderr
+        )
+
+    print(json.dumps({
+        "meta": {
+            "python": sys.version.split()[0],
+            "database": env["DATABASE_URL"].split("://", 1)[0],
+            "schema_check": args.schema_check,
+            "workers": args.workers,
+        },
+        "rounds": rounds,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
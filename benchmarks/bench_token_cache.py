@@ -0,0 +1,42 @@
+"""Cold vs cached access-token verification in ``core.security.verify_token``.
+
+    python -m benchmarks.bench_token_cache --iterations 20000
+"""
+import argparse
+import json
+import timeit
+
+from core.cache import token_cache
+from core.security import create_access_token, verify_token
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token(data={"sub": "00000000-0000-0000-0000-000000000000"})
+
+    def cold():
+        token_cache.clear()
+        verify_token(token)
+
+    def cached():
+        verify_token(token)
+
+    verify_token(token)
+    cold_seconds = timeit.timeit(cold, number=args.iterations)
+    cached_seconds = timeit.timeit(cached, number=args.iterations)
+
+    report = {
+        "iterations": args.iterations,
+        "cold_us_per_call": cold_seconds / args.iterations * 1e6,
+        "cached_us_per_call": cached_seconds / args.iterations * 1e6,
+        "speedup": cold_seconds / cached_seconds,
+        "cache": token_cache.stats(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Check that exactly one forked worker holds each background-job lease.
+
+Imports ``main`` once in the parent, the way gunicorn's ``preload_app``
+does, applies the schema, then forks ``--workers`` processes that all try
+to take the subscription-sweep and quote-poll leases at the same moment.
+Exits non-zero if a lease has no holder or more than one, or if two
+workers share an owner identity.
+
+    python -m benchmarks.check_leases --workers 4
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from typing import List, Optional
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="fx-compass-leases-"), "leases.db")
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{path}"
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+
+def run_worker(barrier, results) -> None:
+    """Body of one forked worker: try every lease once and report the outcome."""
+    from core.database import dispose_engines
+    from services.market_data.poller import quote_poller
+    from services.subscription_scheduler import subscription_scheduler
+
+    leases = [subscription_scheduler.lease, quote_poller.lease]
+
+    async def attempt() -> dict:
+        try:
+            held = {}
+            for lease in leases:
+                held[lease.name] = await lease.acquire()
+            return {"pid": os.getpid(), "owners": [lease.owner for lease in leases], "held": held}
+        finally:
+            await dispose_engines()
+
+    barrier.wait()
+    results.put(asyncio.run(attempt()))
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite database")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    args = parse_args()
+    configure_environment(args)
+    from main import migrate
+
+    migrate()
+
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(args.workers)
+    results = context.Queue()
+    processes = [context.Process(target=run_worker, args=(barrier, results)) for _ in range(args.workers)]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    holders = {}
+    for report in reports:
+        for name, held in report["held"].items():
+            holders.setdefault(name, [])
+            if held:
+                holders[name].append(report["pid"])
+    owners = [owner for report in reports for owner in report["owners"]]
+
+    print(json.dumps({"workers": reports, "holders": holders}, indent=2))
+    problems = [f"{name}: held by {len(pids)} workers" for name, pids in holders.items() if len(pids) != 1]
+    if len(set(owners)) != len(owners):
+        problems.append("workers share a lease owner identity")
+    if problems:
+        print("\n".join(problems), file=sys.stderr)
+        sys.exit(1)
+    print(f"each lease held by exactly one of {args.workers} workers", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import suppress
+from typing import Any, Hashable, Optional, Set
+from core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is only needed for the shared backend
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Bounded in-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Get cache statistics."""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Resolved users for get_current_user, keyed by user id
+principal_cache = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL
+)
+
+class LocalInvalidator:
+    """Invalidate principals in this worker only; other workers wait out a short TTL."""
+
+    def __init__(self, cache: TTLCache):
+        self.cache = cache
+
+    @property
+    def ttl(self) -> float:
+        """How long a principal may be cached right now."""
+        return min(settings.PRINCIPAL_CACHE_TTL, settings.PRINCIPAL_CACHE_LOCAL_TTL)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop a user's cached principal after it changed."""
+        self.cache.invalidate(user_id)
+
+    def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class RedisInvalidator(LocalInvalidator):
+    """Broadcast principal invalidations to every worker through Redis pub/sub.
+
+    Principals are cached for the full PRINCIPAL_CACHE_TTL only while this
+    worker is subscribed; whenever the subscription drops, the cache is
+    cleared and falls back to the local TTL, since messages may have been
+    missed.
+    """
+
+    CHANNEL = "cache-invalidations:principal"
+
+    def __init__(self, cache: TTLCache, url: str):
+        if aioredis is None:
+            raise RuntimeError("The redis package is required for CACHE_INVALIDATION_BACKEND=redis")
+        super().__init__(cache)
+        self.redis = aioredis.from_url(url)
+        self.subscribed = False
+        self._task: Optional[asyncio.Task] = None
+        self._publishing: Set[asyncio.Task] = set()
+
+    @property
+    def ttl(self) -> float:
+        return settings.PRINCIPAL_CACHE_TTL if self.subscribed else super().ttl
+
+    def invalidate(self, user_id: str) -> None:
+        super().invalidate(user_id)
+        task = asyncio.get_running_loop().create_task(self._publish(user_id))
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+
+    async def _publish(self, user_id: str) -> None:
+        try:
+            await self.redis.publish(self.CHANNEL, user_id)
+        except Exception:
+            logger.warning("Could not broadcast principal invalidation", exc_info=True)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    # Anything published while unsubscribed was missed
+                    self.cache.clear()
+                    self.subscribed = True
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.cache.invalidate(message["data"].decode())
+            except Exception:
+                logger.warning("Principal invalidation channel unavailable", exc_info=True)
+            finally:
+                if self.subscribed:
+                    self.subscribed = False
+                    self.cache.clear()
+            await asyncio.sleep(1)
+
+    def start(self) -> None:
+        """Subscribe to invalidations from other workers."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Unsubscribe and wait for pending broadcasts."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._publishing:
+            await asyncio.gather(*self._publishing, return_exceptions=True)
+
+
+def create_principal_invalidator(cache: TTLCache) -> LocalInvalidator:
+    """Build the invalidator configured by CACHE_INVALIDATION_BACKEND."""
+    if settings.CACHE_INVALIDATION_BACKEND == "redis":
+        return RedisInvalidator(cache, settings.REDIS_URL)
+    return LocalInvalidator(cache)
+
+
+principal_invalidator = create_principal_invalidator(principal_cache)
+
+# Verified JWT payloads, keyed by token digest and expiring with the token
+token_cache = TTLCache(
+    max_size=settings.JWT_CACHE_MAX_SIZE,
+    ttl=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
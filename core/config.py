@@ -10,28 +10,129 @@ class Settings(BaseSettings):
     VERSION: str = "1.0.0"
     DEBUG: bool = False
 
+    # Server
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WORKERS: int = int(os.getenv("WEB_CONCURRENCY", "1"))
+    SERVER_LOOP: str = "auto"  # "auto" picks uvloop when installed
+    SERVER_HTTP: str = "auto"  # "auto" picks httptools when installed
+
     # Database Configuration
     DATABASE_URL: str = "mysql+aiomysql://root:@localhost:3306/compassfx"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # seconds
+    DB_POOL_RECYCLE: int = 1800  # seconds, keep below MySQL wait_timeout
+    DB_POOL_PRE_PING: bool = True
+    DB_SLOW_QUERY_MS: int = 200  # statements slower than this are logged
+    DB_SCHEMA_CHECK: str = "version"  # "version": DDL only when the stored schema version differs; "always"; "off"
+    DATABASE_REPLICA_URLS: List[str] = []  # read-only replicas, used round-robin by get_read_db
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0  # keep a user's reads on the primary this long after a write
 
     # JWT Configuration
     JWT_SECRET_KEY: str = "your-secret-key-change-in-production"
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    JWT_CACHE_MAX_SIZE: int = 10000
 
     # Security
     ALLOWED_HOSTS: List[str] = ["localhost", "127.0.0.1", "0.0.0.0"]
+    # Users allowed to call the admin endpoints. Their email_verified flag must be set too,
+    # and there is no verification flow yet, so set it by hand once the address is confirmed:
+    #   UPDATE users SET email_verified = TRUE WHERE email = 'admin@example.com';
+    ADMIN_EMAILS: List[str] = []
+
+    # Caching
+    PRINCIPAL_CACHE_TTL: int = 60  # seconds, while invalidations reach every worker
+    # Without the redis backend a change only invalidates the worker that made it, so other
+    # workers keep serving a deactivated or downgraded user for at most this long
+    PRINCIPAL_CACHE_LOCAL_TTL: int = 5  # seconds
+    CACHE_INVALIDATION_BACKEND: str = "memory"  # "memory" or "redis" (broadcast to every worker)
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATE: float = 1.0  # fraction of successful requests to log
+    LOG_SLOW_REQUEST_MS: int = 1000  # requests slower than this are always logged
+    SERVER_TIMING_ENABLED: bool = True  # emit per-request DB timings in a Server-Timing header
+
+    # Metrics
+    METRICS_MULTIPROC_DIR: Optional[str] = None  # shared directory for aggregating across workers
+    METRICS_FLUSH_INTERVAL: float = 5.0  # seconds
 
     # Rate Limiting
     RATE_LIMIT_REQUESTS: int = 100
     RATE_LIMIT_WINDOW: int = 60  # seconds
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" or "redis" (shared across workers)
+    RATE_LIMIT_MAX_KEYS: int = 100000  # in-memory backend only
+    API_KEY_RATE_LIMIT_WINDOW: int = 3600  # seconds; UserAPIKey.rate_limit is per window
+
+    # API keys
+    API_KEY_DEFAULT_RATE_LIMIT: int = 1000
+    API_KEY_INDEX_MAX_SIZE: int = 100000
+    API_KEY_INDEX_REFRESH_INTERVAL: float = 30.0  # seconds
+
+    # Registration
+    BULK_REGISTER_MAX_USERS: int = 5000
+
+    # Admin exports
+    EXPORT_PAGE_SIZE: int = 10000  # rows per keyset page (one short transaction each)
+    EXPORT_BATCH_SIZE: int = 1000  # rows fetched from the server-side cursor at a time
+
+    # Write-behind for last_login / API-key last_used
+    WRITE_BEHIND_FLUSH_INTERVAL: float = 5.0  # seconds
+    WRITE_BEHIND_MAX_PENDING: int = 50000  # flush early beyond this many rows
+
+    # Subscription expiry/renewal scheduler
+    SUBSCRIPTION_SWEEP_INTERVAL: float = 60.0  # seconds
+    SUBSCRIPTION_SWEEP_BATCH_SIZE: int = 500
+    SUBSCRIPTION_SWEEP_LEASE_TTL: float = 120.0  # seconds; another worker may take over after this
+    SUBSCRIPTION_RENEWAL_DAYS: int = 30
 
     # Encryption
     PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 64  # max hashes in flight before returning 503
 
     # External APIs
     ALPHA_VANTAGE_API_KEY: Optional[str] = None
+    ALPHA_VANTAGE_BASE_URL: str = "https://www.alphavantage.co"
+    ALPHA_VANTAGE_MAX_CONCURRENCY: int = 2
+    ALPHA_VANTAGE_REQUESTS_PER_MINUTE: float = 75  # premium tier; the free tier is 25 per day
     OANDA_API_KEY: Optional[str] = None
+    OANDA_ACCOUNT_ID: Optional[str] = None
+    OANDA_BASE_URL: str = "https://api-fxpractice.oanda.com"
+    OANDA_MAX_CONCURRENCY: int = 4
+    OANDA_REQUESTS_PER_MINUTE: float = 1200
+
+    # Market data ingestion
+    MARKET_DATA_ENABLED: bool = False
+    MARKET_DATA_PROVIDER: str = "oanda"  # provider polled in the background
+    MARKET_DATA_PAIRS: List[str] = []  # empty means all majors and crosses
+    MARKET_DATA_POLL_INTERVAL: float = 5.0  # seconds; stretched if it would exceed the provider quota
+    MARKET_DATA_HTTP_MAX_CONNECTIONS: int = 20
+    MARKET_DATA_HTTP_TIMEOUT: float = 10.0  # seconds
+    MARKET_DATA_MAX_RETRIES: int = 3
+    MARKET_DATA_BACKOFF_BASE: float = 0.5  # seconds; doubled per attempt, with full jitter
+    MARKET_DATA_BACKOFF_MAX: float = 30.0
+    CANDLE_STORE_DIR: str = "data/candles"  # memory-mapped candle files, one directory per pair
+    CANDLE_QUERY_MAX_ROWS: int = 10000
+    CORRELATION_TIMEFRAME: str = "H1"
+    CORRELATION_WINDOW: int = 120  # bars of log returns in the rolling correlation
+
+    # Predictions
+    PREDICTION_TIMEFRAME: str = "H1"
+    PREDICTION_MAX_HORIZON: int = 24  # bars ahead
+    PREDICTION_MODEL_PATH: Optional[str] = None  # .npz with weights and bias; predictions are off without one
+    # Serve the hand-set, untrained baseline model when no model path is configured (development only)
+    PREDICTION_ALLOW_BASELINE: bool = False
+    PREDICTION_MAX_BATCH_SIZE: int = 256
+    PREDICTION_MAX_WAIT: float = 0.01  # seconds a request waits for others to batch with
+    PREDICTION_WORKERS: int = 2
 
     # Redis Configuration
     REDIS_URL: str = "redis://localhost:6379/0"
@@ -1,30 +1,200 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import Delete, Insert, Update, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from core.cache import TTLCache
 from core.config import settings
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    poolclass=NullPool,
-    future=True
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records checkout wait statistics."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.acquire_count = 0
+        self.acquire_time_total = 0.0
+        self.acquire_time_max = 0.0
+
+    def _do_get(self):
+        self.waiting += 1
+        start_time = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start_time
+            self.waiting -= 1
+            self.acquire_count += 1
+            self.acquire_time_total += elapsed
+            if elapsed > self.acquire_time_max:
+                self.acquire_time_max = elapsed
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        future=True
+    )
+
+
+# Create async engines
+engine = _create_engine(settings.DATABASE_URL)
+replica_engines = [_create_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+
+class QueryStats:
+    """SQL statement count and timing attributed to one request."""
+
+    __slots__ = ("count", "total_time", "slowest_time", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+
+# Set per request by QueryStatsMiddleware; None outside a request
+request_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.query_start_time
+
+    stats = request_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    # Parameters are deliberately not logged; they can contain credentials and PII
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1fms): %s", elapsed * 1000, statement[:1000],
+            extra={"duration_ms": round(elapsed * 1000, 3), "executemany": executemany}
+        )
+
+
+for _engine in (engine, *replica_engines):
+    event.listen(_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# Users who wrote recently; their reads stay on the primary until replicas catch up.
+# This is per process, so it covers requests that land on the same worker.
+_recent_writers = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.DB_READ_YOUR_WRITES_SECONDS
 )
+_replica_cycle = itertools.cycle(replica_engines) if replica_engines else None
+
+
+def record_write(user_id) -> None:
+    """Open the read-your-writes window for a user after a committed write."""
+    if _replica_cycle is not None:
+        _recent_writers.set(str(user_id), True)
+
+
+def route_reads_for(session: AsyncSession, user_id) -> None:
+    """Pin a read session to the primary if the user is inside their read-your-writes window."""
+    if _replica_cycle is not None and _recent_writers.get(str(user_id)) is not None:
+        session.info["use_primary"] = True
+
 
-# Create session factory
+class RoutingSession(Session):
+    """Send reads to a replica, chosen round-robin once per session, and writes to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            _replica_cycle is None
+            or self._flushing
+            or isinstance(clause, (Insert, Update, Delete))
+            or self.info.get("use_primary")
+        ):
+            return engine.sync_engine
+
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = self.info["replica"] = next(_replica_cycle).sync_engine
+        return replica
+
+
+# Create session factories
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+ReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
+
+def get_pool_stats() -> dict:
+    """Get connection pool statistics."""
+    pool = engine.sync_engine.pool
+    acquire_count = pool.acquire_count
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "waiting": pool.waiting,
+        "acquire_count": acquire_count,
+        "acquire_time_total_ms": pool.acquire_time_total * 1000,
+        "acquire_time_avg_ms": (pool.acquire_time_total / acquire_count * 1000) if acquire_count else 0.0,
+        "acquire_time_max_ms": pool.acquire_time_max * 1000,
+    }
+
+
+async def dispose_engines() -> None:
+    """Close the primary and replica connection pools."""
+    for _engine in (engine, *replica_engines):
+        await _engine.dispose()
+
+
 # Dependency to get database session
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+# Dependency to get a read-only session that may be served by a replica
+async def get_read_db():
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -8,7 +8,11 @@ logger = logging.getLogger(__name__)
 
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Handle HTTP exceptions."""
-    logger.error(f"HTTP Exception: {exc.status_code} - {exc.detail}")
+    # Request outcomes are already logged by LoggingMiddleware; only server errors are noteworthy here
+    if exc.status_code >= 500:
+        logger.error("HTTP Exception: %s - %s", exc.status_code, exc.detail)
+    else:
+        logger.debug("HTTP Exception: %s - %s", exc.status_code, exc.detail)
     return JSONResponse(
         status_code=exc.status_code,
         content={
@@ -20,7 +24,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors."""
-    logger.error(f"Validation Error: {exc.errors()}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Validation Error: %s", exc.errors())
     return JSONResponse(
         status_code=422,
         content={
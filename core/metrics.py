@@ -0,0 +1,388 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager, suppress
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "http_request_duration_seconds": ("histogram", "Request latency by route template."),
+    "http_responses_total": ("counter", "Responses by route template and status code."),
+    "http_requests_in_flight": ("gauge", "Requests currently being served."),
+    "db_pool_size": ("gauge", "Configured connection pool size."),
+    "db_pool_checked_out": ("gauge", "Connections currently checked out of the pool."),
+    "db_pool_overflow": ("gauge", "Connections open beyond the pool size."),
+    "db_pool_waiting": ("gauge", "Callers waiting for a pooled connection."),
+    "db_pool_acquires_total": ("counter", "Connection checkouts from the pool."),
+    "db_pool_acquire_seconds_total": ("counter", "Time spent waiting for pooled connections."),
+    "cache_hits_total": ("counter", "Cache hits."),
+    "cache_misses_total": ("counter", "Cache misses."),
+    "cache_entries": ("gauge", "Entries currently cached."),
+    "subscription_sweep_batches_total": ("counter", "Subscription sweep batches committed."),
+    "subscription_sweep_rows_total": ("counter", "Subscriptions renewed or expired by the sweep."),
+    "subscription_sweep_seconds_total": ("counter", "Time spent in subscription sweeps."),
+}
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Optional[dict]) -> LabelKey:
+    return name, tuple(sorted((labels or {}).items()))
+
+
+class MetricsRegistry:
+    """In-process counters, gauges and latency histograms.
+
+    Updates are plain dict operations on the event loop thread. ``snapshot``
+    produces a JSON-able view that can be merged with other workers' views.
+    """
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.in_flight = 0
+        # (method, route) -> [count per bucket..., +Inf count, sum]
+        self.latency: Dict[Tuple[str, str], list] = {}
+        self.counters: Dict[LabelKey, float] = {}
+        self._gauge_collectors: List[Callable[[], Iterable[Tuple[str, dict, float]]]] = []
+
+    def observe_request(self, method: str, route: str, status_code: int, duration: float) -> None:
+        """Record a finished request."""
+        series = self.latency.get((method, route))
+        if series is None:
+            series = [0] * (len(self.buckets) + 1) + [0.0]
+            self.latency[(method, route)] = series
+        series[bisect_left(self.buckets, duration)] += 1
+        series[-1] += duration
+        self.inc("http_responses_total", {"method": method, "route": route, "status": str(status_code)})
+
+    def inc(self, name: str, labels: Optional[dict] = None, value: float = 1) -> None:
+        """Increment a counter."""
+        key = _key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def describe(self, name: str, metric_type: str, help_text: str) -> None:
+        """Register TYPE and HELP metadata for a metric name."""
+        HELP[name] = (metric_type, help_text)
+
+    def register_gauges(self, collector: Callable[[], Iterable[Tuple[str, dict, float]]]) -> None:
+        """Register a callable returning (name, labels, value) gauge samples at scrape time."""
+        self._gauge_collectors.append(collector)
+
+    def snapshot(self, include_gauges: bool = True) -> dict:
+        """Get a JSON-able copy of the current values."""
+        gauges = []
+        if include_gauges:
+            gauges.append(["http_requests_in_flight", {}, self.in_flight])
+            for collector in self._gauge_collectors:
+                gauges.extend([name, labels, value] for name, labels, value in collector())
+
+        return {
+            "taken_at": time.monotonic(),
+            "buckets": list(self.buckets),
+            "latency": [[method, route, list(series)] for (method, route), series in self.latency.items()],
+            "counters": [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+            "gauges": gauges,
+        }
+
+
+def merge_snapshots(snapshots: Iterable[dict]) -> dict:
+    """Sum snapshots from several workers into one."""
+    latency: Dict[Tuple[str, str], list] = {}
+    counters: Dict[LabelKey, float] = {}
+    gauges: Dict[LabelKey, float] = {}
+    buckets: list = list(LATENCY_BUCKETS)
+
+    for snapshot in snapshots:
+        buckets = snapshot["buckets"]
+        for method, route, series in snapshot["latency"]:
+            merged = latency.get((method, route))
+            if merged is None:
+                latency[(method, route)] = list(series)
+            else:
+                for i, value in enumerate(series):
+                    merged[i] += value
+        for target, samples in ((counters, snapshot["counters"]), (gauges, snapshot["gauges"])):
+            for name, labels, value in samples:
+                key = _key(name, labels)
+                target[key] = target.get(key, 0) + value
+
+    return {
+        "buckets": buckets,
+        "latency": [[method, route, series] for (method, route), series in latency.items()],
+        "counters": [[name, dict(labels), value] for (name, labels), value in counters.items()],
+        "gauges": [[name, dict(labels), value] for (name, labels), value in gauges.items()],
+    }
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels.items()
+    )
+    return "{" + body + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(snapshot: dict) -> str:
+    """Render a snapshot in the Prometheus text exposition format."""
+    lines: List[str] = []
+    described = set()
+
+    def header(name: str, default_type: str) -> None:
+        if name in described:
+            return
+        described.add(name)
+        metric_type, help_text = HELP.get(name, (default_type, name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    name = "http_request_duration_seconds"
+    bounds = [_format_value(float(b)) for b in snapshot["buckets"]] + ["+Inf"]
+    for method, route, series in sorted(snapshot["latency"]):
+        header(name, "histogram")
+        cumulative = 0
+        for bound, count in zip(bounds, series[:-1]):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels({'method': method, 'route': route, 'le': bound})} {cumulative}")
+        labels = _format_labels({"method": method, "route": route})
+        lines.append(f"{name}_sum{labels} {_format_value(float(series[-1]))}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+
+    for metric_type, samples in (("counter", snapshot["counters"]), ("gauge", snapshot["gauges"])):
+        for name, labels, value in sorted(samples, key=lambda s: (s[0], sorted(s[1].items()))):
+            header(name, metric_type)
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _default_gauges():
+    from core.cache import principal_cache, token_cache
+    from core.database import get_pool_stats
+
+    pool = get_pool_stats()
+    yield "db_pool_size", {}, pool["size"]
+    yield "db_pool_checked_out", {}, pool["checked_out"]
+    yield "db_pool_overflow", {}, max(pool["overflow"], 0)
+    yield "db_pool_waiting", {}, pool["waiting"]
+    yield "db_pool_acquires_total", {}, pool["acquire_count"]
+    yield "db_pool_acquire_seconds_total", {}, pool["acquire_time_total_ms"] / 1000
+
+    for name, cache in (("principal", principal_cache), ("token", token_cache)):
+        stats = cache.stats()
+        yield "cache_hits_total", {"cache": name}, stats["hits"]
+        yield "cache_misses_total", {"cache": name}, stats["misses"]
+        yield "cache_entries", {"cache": name}, stats["size"]
+
+
+registry = MetricsRegistry()
+registry.register_gauges(_default_gauges)
+
+
+# Counters of exited workers are folded into this file so dead snapshots can be deleted
+RETIRED_SNAPSHOT = "metrics-retired.json"
+
+# Live workers rewrite their snapshot every flush interval; one untouched this many intervals is dead
+RETIRE_AFTER_INTERVALS = 60
+
+_snapshot_name: Optional[str] = None
+_snapshot_pid: Optional[int] = None
+_write_lock = threading.Lock()
+_last_written = float("-inf")
+
+
+def _snapshot_path() -> str:
+    """This worker's snapshot file, named per process so a recycled pid never takes over a dead worker's file."""
+    global _snapshot_name, _snapshot_pid
+    pid = os.getpid()
+    if _snapshot_pid != pid:
+        _snapshot_name = f"metrics-{pid}-{uuid.uuid4().hex[:8]}.json"
+        _snapshot_pid = pid
+    return os.path.join(settings.METRICS_MULTIPROC_DIR, _snapshot_name)
+
+
+def _replace_json(path: str, payload: dict) -> None:
+    # A temp file of its own per call, so concurrent writers never share one
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".metrics-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_snapshot(snapshot: dict) -> None:
+    """Atomically publish this worker's snapshot for other workers to merge.
+
+    Called from several threads (the periodic writer and concurrent scrapes);
+    a snapshot older than the one already published is dropped so readers
+    never see this worker's counters go backwards.
+    """
+    global _last_written
+    with _write_lock:
+        taken_at = snapshot.get("taken_at", time.monotonic())
+        if taken_at < _last_written:
+            return
+        _replace_json(_snapshot_path(), snapshot)
+        _last_written = taken_at
+
+
+@contextmanager
+def _directory_lock(directory: str, exclusive: bool):
+    with open(os.path.join(directory, ".lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _snapshot_files(directory: str) -> List[str]:
+    return [
+        filename for filename in os.listdir(directory)
+        if filename.startswith("metrics-") and filename.endswith(".json") and filename != RETIRED_SNAPSHOT
+    ]
+
+
+def _load_json(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _retire_dead_snapshots(directory: str) -> None:
+    """Fold the counters of exited workers into RETIRED_SNAPSHOT and delete their files."""
+    dead_before = time.time() - RETIRE_AFTER_INTERVALS * settings.METRICS_FLUSH_INTERVAL
+
+    def dead_files() -> List[str]:
+        dead = []
+        for filename in _snapshot_files(directory):
+            with suppress(OSError):
+                if os.path.getmtime(os.path.join(directory, filename)) < dead_before:
+                    dead.append(filename)
+        return dead
+
+    if not dead_files():
+        return
+    with _directory_lock(directory, exclusive=True):
+        retired_path = os.path.join(directory, RETIRED_SNAPSHOT)
+        retired = _load_json(retired_path) or {}
+        merged_names = [name for name in retired.get("merged", []) if os.path.exists(os.path.join(directory, name))]
+        snapshots = [retired] if retired else []
+        dead = [name for name in dead_files() if name not in merged_names]
+        for filename in dead:
+            snapshot = _load_json(os.path.join(directory, filename))
+            if snapshot is not None:
+                snapshots.append(snapshot)
+        if not dead:
+            return
+
+        combined = merge_snapshots(snapshots)
+        combined["gauges"] = []
+        # Names are kept until their files are gone, so a crash before unlinking cannot count them twice
+        combined["merged"] = merged_names + dead
+        _replace_json(retired_path, combined)
+        for filename in dead:
+            with suppress(OSError):
+                os.unlink(os.path.join(directory, filename))
+
+
+def collect(snapshot: dict) -> str:
+    """Render this worker's snapshot merged with every other worker's.
+
+    Counters from exited workers are kept so totals never go backwards;
+    gauges from snapshots older than a few flush intervals are ignored.
+    """
+    directory = settings.METRICS_MULTIPROC_DIR
+    if not directory:
+        return render_prometheus(snapshot)
+
+    write_snapshot(snapshot)
+    _retire_dead_snapshots(directory)
+    stale_before = time.time() - 3 * settings.METRICS_FLUSH_INTERVAL
+    snapshots = []
+    with _directory_lock(directory, exclusive=False):
+        retired = _load_json(os.path.join(directory, RETIRED_SNAPSHOT))
+        merged_names = set()
+        if retired is not None:
+            merged_names.update(retired.get("merged", []))
+            snapshots.append(retired)
+        for filename in _snapshot_files(directory):
+            if filename in merged_names:
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                with open(path) as f:
+                    worker_snapshot = json.load(f)
+                if os.path.getmtime(path) < stale_before:
+                    worker_snapshot["gauges"] = []
+            except (OSError, ValueError):
+                continue
+            snapshots.append(worker_snapshot)
+
+    return render_prometheus(merge_snapshots(snapshots))
+
+
+async def run_snapshot_writer() -> None:
+    """Periodically publish this worker's snapshot to METRICS_MULTIPROC_DIR."""
+    while True:
+        await asyncio.sleep(settings.METRICS_FLUSH_INTERVAL)
+        try:
+            await asyncio.to_thread(write_snapshot, registry.snapshot())
+        except Exception:
+            # Keep publishing; one failed write must not stop this worker's metrics for good
+            logger.exception("Could not write metrics snapshot")
+
+
+class MetricsMiddleware:
+    """Record latency, status and in-flight counts per route template."""
+
+    def __init__(self, app: ASGIApp, metrics: Optional[MetricsRegistry] = None):
+        self.app = app
+        self.metrics = metrics or registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.in_flight -= 1
+            # Label by route template, never the raw path, to keep cardinality bounded
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "<unmatched>"
+            self.metrics.observe_request(scope["method"], route_path, status_code, time.perf_counter() - start_time)
@@ -1,62 +1,137 @@
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import math
+import random
 import time
 import logging
-from typing import Callable
-import asyncio
-from collections import defaultdict
+from typing import Optional
+from core.config import settings
+from core.database import QueryStats, request_query_stats
+from core.rate_limit import rate_limiter
 
 logger = logging.getLogger(__name__)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        start_time = time.time()
+class LoggingMiddleware:
+    """Log one structured record per request.
 
-        # Log request
-        logger.info(f"Request: {request.method} {request.url}")
+    Successful requests are sampled at ``sample_rate``; client and server
+    errors and requests slower than ``slow_request_ms`` are always logged.
+    """
 
-        try:
-            response = await call_next(request)
+    def __init__(self, app: ASGIApp, sample_rate: Optional[float] = None, slow_request_ms: Optional[int] = None):
+        self.app = app
+        self.sample_rate = settings.LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.slow_request_ms = settings.LOG_SLOW_REQUEST_MS if slow_request_ms is None else slow_request_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-            # Log response
-            process_time = time.time() - start_time
-            logger.info(f"Response: {response.status_code} - {process_time:.3f}s")
+        start_time = time.perf_counter()
+        status_code = 500
 
-            return response
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-        except Exception as e:
-            process_time = time.time() - start_time
-            logger.error(f"Error: {str(e)} - {process_time:.3f}s")
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            logger.exception(
+                "%s %s failed after %.1fms", scope["method"], scope["path"], duration_ms,
+                extra=self._fields(scope, 500, duration_ms)
+            )
             raise
 
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        if status_code >= 500:
+            level = logging.ERROR
+        elif duration_ms >= self.slow_request_ms:
+            level = logging.WARNING
+        elif status_code >= 400 or random.random() < self.sample_rate:
+            level = logging.INFO
+        else:
+            return
+
+        if logger.isEnabledFor(level):
+            logger.log(
+                level, "%s %s %s %.1fms", scope["method"], scope["path"], status_code, duration_ms,
+                extra=self._fields(scope, status_code, duration_ms)
+            )
+
+    @staticmethod
+    def _fields(scope: Scope, status_code: int, duration_ms: float) -> dict:
+        client = scope.get("client")
+        return {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status_code": status_code,
+            "duration_ms": round(duration_ms, 3),
+            "client_ip": client[0] if client else None,
+        }
+
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, requests_per_minute: int = 100):
-        super().__init__(app)
-        self.requests_per_minute = requests_per_minute
-        self.requests = defaultdict(list)
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, limiter=None, requests: Optional[int] = None, window: Optional[int] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+        self.requests = settings.RATE_LIMIT_REQUESTS if requests is None else requests
+        self.window = window or settings.RATE_LIMIT_WINDOW
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        client_ip = request.client.host
-        current_time = time.time()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        # Clean old requests
-        self.requests[client_ip] = [
-            req_time for req_time in self.requests[client_ip]
-            if current_time - req_time < 60  # Keep requests from last minute
-        ]
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
 
         # Check rate limit
-        if len(self.requests[client_ip]) >= self.requests_per_minute:
-            return JSONResponse(
+        result = await self.limiter.hit(f"ip:{client_ip}", self.requests, self.window)
+        if not result.allowed:
+            response = JSONResponse(
                 status_code=429,
-                content={"detail": "Rate limit exceeded"}
+                content={"detail": "Rate limit exceeded"},
+                headers={"Retry-After": str(math.ceil(result.retry_after))}
             )
+            await response(scope, receive, send)
+            return
 
-        # Add current request
-        self.requests[client_ip].append(current_time)
+        await self.app(scope, receive, send)
 
-        response = await call_next(request)
-        return response
+
+class QueryStatsMiddleware:
+    """Attribute SQL statements to the request and report them via Server-Timing."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        stats = QueryStats()
+        token = request_query_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", ", ".join((
+                    f'db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries"',
+                    f"db-slowest;dur={stats.slowest_time * 1000:.1f}",
+                    f"app;dur={(time.perf_counter() - start_time) * 1000:.1f}",
+                )))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_query_stats.reset(token)
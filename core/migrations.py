@@ -0,0 +1,171 @@
+import hashlib
+import logging
+from typing import Optional
+from sqlalchemy import Connection, func, inspect, select, text, update
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from core.database import Base
+from models.schema import SchemaVersion
+
+logger = logging.getLogger(__name__)
+
+# Bump when run_migrations changes in a way the models do not reflect (e.g. data fixes)
+MIGRATIONS_REVISION = 1
+
+
+def _add_missing_columns(conn: Connection) -> list:
+    """Add model columns that existing tables predate.
+
+    Only columns that are nullable or have a server default are added
+    automatically; anything else needs a hand-written migration.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    ddl = conn.dialect.ddl_compiler(conn.dialect, None)
+    preparer = conn.dialect.identifier_preparer
+    added = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise RuntimeError(f"Cannot add column {table.name}.{column.name} automatically")
+            conn.execute(text(
+                f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl.get_column_specification(column)}"
+            ))
+            added.append(f"{table.name}.{column.name}")
+
+    return added
+
+
+def _create_missing_indexes(conn: Connection) -> list:
+    """Create model indexes that existing tables predate."""
+    inspector = inspect(conn)
+    created = []
+
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        existing.update(constraint["name"] for constraint in inspector.get_unique_constraints(table.name))
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                created.append(index.name)
+
+    return created
+
+
+def _enforce_single_active_subscription(conn: Connection) -> int:
+    """Cancel all but the newest ACTIVE subscription per user and backfill active_user_id.
+
+    Must run before the unique index on active_user_id is created.
+    """
+    from models.user import SubscriptionStatus, UserSubscription
+
+    duplicated = (
+        select(UserSubscription.user_id)
+        .where(UserSubscription.status == SubscriptionStatus.ACTIVE)
+        .group_by(UserSubscription.user_id)
+        .having(func.count() > 1)
+    )
+    rows = conn.execute(
+        select(UserSubscription.id, UserSubscription.user_id)
+        .where(
+            UserSubscription.status == SubscriptionStatus.ACTIVE,
+            UserSubscription.user_id.in_(duplicated)
+        )
+        .order_by(
+            UserSubscription.user_id,
+            UserSubscription.start_date.desc(),
+            UserSubscription.created_at.desc()
+        )
+    ).all()
+
+    seen = set()
+    stale = []
+    for subscription_id, user_id in rows:
+        if user_id in seen:
+            stale.append(subscription_id)
+        seen.add(user_id)
+
+    if stale:
+        conn.execute(
+            update(UserSubscription)
+            .where(UserSubscription.id.in_(stale))
+            .values(
+                status=SubscriptionStatus.CANCELLED,
+                active_user_id=None,
+                version=UserSubscription.version + 1
+            )
+        )
+
+    conn.execute(
+        update(UserSubscription)
+        .where(
+            UserSubscription.status == SubscriptionStatus.ACTIVE,
+            UserSubscription.active_user_id.is_(None)
+        )
+        .values(active_user_id=UserSubscription.user_id)
+    )
+
+    return len(stale)
+
+
+def run_migrations(conn: Connection) -> None:
+    """Bring existing tables up to the current models.
+
+    Runs after ``create_all`` inside the same transaction and is idempotent,
+    so it is safe on every startup.
+    """
+    added = _add_missing_columns(conn)
+    cancelled = _enforce_single_active_subscription(conn)
+    created = _create_missing_indexes(conn)
+
+    if added:
+        logger.info("Added columns: %s", ", ".join(added))
+    if cancelled:
+        logger.warning("Cancelled %d duplicate active subscriptions", cancelled)
+    if created:
+        logger.info("Created indexes: %s", ", ".join(created))
+
+
+def schema_fingerprint(conn: Connection) -> str:
+    """Hash of the DDL the current models compile to on this connection's dialect."""
+    statements = [f"revision {MIGRATIONS_REVISION}"]
+    for table in Base.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=conn.dialect)))
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            statements.append(str(CreateIndex(index).compile(dialect=conn.dialect)))
+    return hashlib.sha256("\n".join(statements).encode()).hexdigest()
+
+
+def stored_schema_version(conn: Connection) -> Optional[str]:
+    """The fingerprint recorded by the last successful migration, if any."""
+    try:
+        return conn.execute(select(SchemaVersion.version).where(SchemaVersion.id == 1)).scalar()
+    except (OperationalError, ProgrammingError):
+        # Table does not exist yet
+        conn.rollback()
+        return None
+
+
+def is_schema_current(conn: Connection) -> bool:
+    return stored_schema_version(conn) == schema_fingerprint(conn)
+
+
+def apply_schema(conn: Connection) -> None:
+    """Create missing tables, migrate existing ones and record the new fingerprint."""
+    Base.metadata.create_all(conn)
+    run_migrations(conn)
+
+    version = schema_fingerprint(conn)
+    updated = conn.execute(
+        update(SchemaVersion).where(SchemaVersion.id == 1).values(version=version)
+    ).rowcount
+    if not updated:
+        conn.execute(SchemaVersion.__table__.insert().values(id=1, version=version))
+    logger.info("Schema is at version %s", version[:12])
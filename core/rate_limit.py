@@ -0,0 +1,145 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from fastapi import HTTPException, status
+from core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is only needed for the shared backend
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+
+
+def _evaluate(previous: int, current: int, now: float, window: int, limit: int) -> RateLimitResult:
+    """Apply the sliding-window-counter estimate to a pair of fixed-window counts.
+
+    ``current`` excludes the request being evaluated.
+    """
+    elapsed = now % window
+    weight = 1 - elapsed / window
+    estimated = previous * weight + current
+
+    if estimated + 1 > limit:
+        if current + 1 > limit or previous == 0:
+            retry_after = window - elapsed
+        else:
+            # Time until the previous window's weighted share drops enough
+            retry_after = window * (1 - (limit - 1 - current) / previous) - elapsed
+        return RateLimitResult(False, limit, 0, max(retry_after, 0.0))
+
+    return RateLimitResult(True, limit, int(limit - estimated - 1), 0.0)
+
+
+class InMemoryRateLimiter:
+    """Per-process sliding-window-counter limiter with idle-key eviction."""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # key -> [window_start, window, current_count, previous_count], least recently seen first
+        self._counters: "OrderedDict[str, list]" = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        """Count a request against key and report whether it is allowed."""
+        now = time.time()
+        window_start = now - now % window
+
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = [window_start, window, 0, 0]
+            self._counters[key] = counter
+        else:
+            self._counters.move_to_end(key)
+            if counter[0] != window_start:
+                # Roll over: the old current window becomes previous only if adjacent
+                counter[3] = counter[2] if counter[0] == window_start - window else 0
+                counter[2] = 0
+                counter[0] = window_start
+                counter[1] = window
+
+        result = _evaluate(counter[3], counter[2], now, window, limit)
+        if result.allowed:
+            counter[2] += 1
+
+        self._evict(now)
+        return result
+
+    def _evict(self, now: float) -> None:
+        # Keys stop mattering once both of their windows have passed
+        while self._counters:
+            key, counter = next(iter(self._counters.items()))
+            idle = now - counter[0] >= 2 * counter[1]
+            if not idle and len(self._counters) <= self.max_keys:
+                break
+            del self._counters[key]
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+
+class RedisRateLimiter:
+    """Sliding-window-counter limiter shared by all workers through Redis."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit"):
+        if aioredis is None:
+            raise RuntimeError("The redis package is required for RATE_LIMIT_BACKEND=redis")
+        self.prefix = prefix
+        self.redis = aioredis.from_url(url)
+
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        """Count a request against key and report whether it is allowed."""
+        now = time.time()
+        window_index = int(now // window)
+        current_key = f"{self.prefix}:{key}:{window_index}"
+        previous_key = f"{self.prefix}:{key}:{window_index - 1}"
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.incr(current_key)
+                pipe.expire(current_key, window * 2)
+                pipe.get(previous_key)
+                current, _, previous = await pipe.execute()
+
+            result = _evaluate(int(previous or 0), current - 1, now, window, limit)
+            if not result.allowed:
+                # Rejected requests do not consume budget
+                await self.redis.decr(current_key)
+            return result
+
+        except Exception:
+            # Fail open: losing the shared limiter must not take the API down
+            logger.warning("Rate limit backend unavailable", exc_info=True)
+            return RateLimitResult(True, limit, limit, 0.0)
+
+
+def create_rate_limiter():
+    """Build the limiter configured by RATE_LIMIT_BACKEND."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimiter(settings.REDIS_URL)
+    return InMemoryRateLimiter(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = create_rate_limiter()
+
+
+async def check_rate_limit(key: str, limit: int, window: int = None) -> RateLimitResult:
+    """Count a request for a principal and raise 429 when over its limit."""
+    result = await rate_limiter.hit(key, limit, window or settings.RATE_LIMIT_WINDOW)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(math.ceil(result.retry_after))}
+        )
+    return result
@@ -1,12 +1,21 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
-from jose import JWTError, jwt
+from typing import List, Optional, Union
+from jose import ExpiredSignatureError, JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+from core.cache import token_cache
 from core.config import settings
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -19,6 +28,83 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """Run bcrypt hashing on a bounded executor, off the event loop."""
+
+    def __init__(self, max_workers: int, max_pending: int, use_processes: bool = False):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self.pending = 0
+        self._executor: Optional[Executor] = None
+        self._bulk_slots: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, please retry",
+                headers={"Retry-After": "1"}
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Generate password hash without blocking the event loop."""
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash without blocking the event loop."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash a batch of passwords, at most ``max_workers`` at a time across all batches.
+
+        Bulk work waits for capacity instead of taking the interactive 503 path,
+        so a login spike cannot fail an import part-way through; interactive
+        calls still get a turn on the executor between bulk hashes.
+        """
+        if self._bulk_slots is None:
+            self._bulk_slots = asyncio.Semaphore(self.max_workers)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+
+        async def hash_one(password: str) -> str:
+            async with self._bulk_slots:
+                return await loop.run_in_executor(executor, get_password_hash, password)
+
+        return list(await asyncio.gather(*(hash_one(password) for password in passwords)))
+
+    def shutdown(self) -> None:
+        """Stop the executor, waiting for running hashes to finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_QUEUE_SIZE,
+    use_processes=settings.PASSWORD_HASH_EXECUTOR == "process"
+)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token."""
     to_encode = data.copy()
@@ -47,34 +133,39 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
 
 def verify_token(token: str, token_type: str = "access") -> dict:
     """Verify JWT token and return payload."""
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-
-        # Check token type
-        if payload.get("type") != token_type:
+    # Tokens are reused many times; skip signature checks for ones already verified
+    cache_key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(cache_key)
+
+    if payload is None:
+        try:
+            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        except ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token type"
+                detail="Token expired"
             )
-
-        # Check expiration
-        exp = payload.get("exp")
-        if exp is None:
+        except JWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token missing expiration"
+                detail="Invalid token"
             )
 
-        if datetime.utcnow() > datetime.utcfromtimestamp(exp):
+        # Check expiration (jwt.decode already rejects expired tokens)
+        exp = payload.get("exp")
+        if exp is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token expired"
+                detail="Token missing expiration"
             )
 
-        return payload
+        token_cache.set(cache_key, payload, ttl=exp - time.time())
 
-    except JWTError:
+    # Check token type
+    if payload.get("type") != token_type:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
+            detail="Invalid token type"
         )
+
+    return payload
@@ -0,0 +1,25 @@
+"""Production launcher settings.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+The app is imported once in the master and forked into the workers, and the
+schema is applied once before any worker starts, so each worker only runs
+its cheap schema version check on boot.
+"""
+from core.config import settings
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = settings.WORKERS
+# Uses uvloop and httptools when they are installed
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+accesslog = None  # LoggingMiddleware already logs requests
+
+
+def on_starting(server):
+    from main import migrate
+
+    migrate()
@@ -2,27 +2,101 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import os
 import uvicorn
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
+from core.cache import principal_invalidator
 from core.config import settings
-from core.database import engine, Base
+from sqlalchemy.exc import DBAPIError
+from core.database import engine, dispose_engines
+from core.logs import setup_logging, shutdown_logging
+from core.migrations import apply_schema, is_schema_current
+from core.security import password_hasher
 from api.v1.router import api_router
 from core.exceptions import validation_exception_handler, http_exception_handler
-from core.middleware import LoggingMiddleware, RateLimitMiddleware
+from core.middleware import LoggingMiddleware, RateLimitMiddleware, QueryStatsMiddleware
+from core import metrics
+from services.api_key_service import api_key_index
+from services.market_data.poller import quote_poller
+from services.market_data.service import market_data_service
+from services.prediction.service import prediction_service
+from services.subscription_scheduler import subscription_scheduler
+from services.write_behind import write_behind
 
 # Database initialization
+SCHEMA_APPLY_ATTEMPTS = 5
+
+
 async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """Bring the schema up to date according to DB_SCHEMA_CHECK."""
+    if settings.DB_SCHEMA_CHECK == "off":
+        return
+
+    for attempt in range(SCHEMA_APPLY_ATTEMPTS):
+        # One indexed SELECT instead of reflecting every table on each worker start
+        if settings.DB_SCHEMA_CHECK == "version" or attempt:
+            async with engine.connect() as conn:
+                if await conn.run_sync(is_schema_current):
+                    return
+
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(apply_schema)
+            return
+        except DBAPIError:
+            # Workers starting together race on the DDL; the migration is idempotent, so retry
+            if attempt == SCHEMA_APPLY_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(0.2 * (attempt + 1))
+
+
+def migrate():
+    """Apply the schema once, before any worker starts."""
+    async def _migrate():
+        try:
+            await init_db()
+        finally:
+            await dispose_engines()
+
+    asyncio.run(_migrate())
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    setup_logging()
     await init_db()
+    write_behind.start()
+    principal_invalidator.start()
+    await api_key_index.start()
+    subscription_scheduler.start()
+    if settings.MARKET_DATA_ENABLED:
+        quote_poller.start()
+    metrics_writer = None
+    if settings.METRICS_MULTIPROC_DIR:
+        os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+        metrics_writer = asyncio.create_task(metrics.run_snapshot_writer())
     yield
     # Shutdown
-    await engine.dispose()
+    await quote_poller.stop()
+    await market_data_service.close()
+    await subscription_scheduler.stop()
+    await api_key_index.stop()
+    await principal_invalidator.stop()
+    await write_behind.stop()
+    if metrics_writer is not None:
+        metrics_writer.cancel()
+        with suppress(asyncio.CancelledError):
+            await metrics_writer
+        # Keep this worker's counters in the aggregate, but drop its gauges
+        metrics.write_snapshot(metrics.registry.snapshot(include_gauges=False))
+    password_hasher.shutdown()
+    prediction_service.shutdown()
+    await dispose_engines()
+    shutdown_logging()
 
 # FastAPI app initialization
 app = FastAPI(
@@ -30,6 +104,7 @@ app = FastAPI(
     description="Forex Prediction Application with Macro Analytics",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
 )
@@ -51,8 +126,11 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS
 )
 
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(RateLimitMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Exception handlers
 app.add_exception_handler(HTTPException, http_exception_handler)
@@ -69,11 +147,22 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": "2024-01-01T00:00:00Z"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    snapshot = metrics.registry.snapshot()
+    content = await run_in_threadpool(metrics.collect, snapshot)
+    return PlainTextResponse(content, media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
+    migrate()
     uvicorn.run(
-        "app.main:app",
-        host="0.0.0.0",
-        port=8000,
+        "main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=settings.WORKERS,
+        loop=settings.SERVER_LOOP,
+        http=settings.SERVER_HTTP,
         reload=settings.DEBUG,
-        log_level="info"
+        log_level=settings.LOG_LEVEL.lower(),
+        access_log=False  # LoggingMiddleware already logs requests
     )
\ No newline at end of file
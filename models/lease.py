@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime
+from core.database import Base
+
+
+class SchedulerLease(Base):
+    """A named, time-limited lock so only one worker runs a periodic job."""
+
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(100), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,6 +1,5 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Enum, Text, JSON,Integer
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.sql import func
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, Text, JSON,Integer, ForeignKey, Index, Uuid
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 import uuid
 import enum
@@ -17,7 +16,7 @@ class UserTier(str, enum.Enum):
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String(255), unique=True, nullable=False, index=True)
     username = Column(String(50), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
@@ -28,6 +27,8 @@ class User(Base):
     email_verified = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped on every change to the user's profile, tier or status; drives ETags
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
     last_login = Column(DateTime(timezone=True))
     timezone = Column(String(50), default="UTC")
     preferences = Column(JSON, default=dict)
@@ -46,17 +47,26 @@ class SubscriptionStatus(str, enum.Enum):
 
 class UserSubscription(Base):
     __tablename__ = "user_subscriptions"
-
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    __table_args__ = (
+        Index("ix_user_subscriptions_user_id_status", "user_id", "status"),
+        Index("ix_user_subscriptions_status_end_date", "status", "end_date"),
+        Index("uq_user_subscriptions_active_user_id", "active_user_id", unique=True),
+    )
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
     tier = Column(Enum(UserTier), nullable=False)
     status = Column(Enum(SubscriptionStatus), default=SubscriptionStatus.ACTIVE)
     start_date = Column(DateTime(timezone=True), server_default=func.now())
     end_date = Column(DateTime(timezone=True))
     auto_renew = Column(Boolean, default=True)
     payment_method_id = Column(String(100))
+    # Equals user_id while the row is ACTIVE and NULL otherwise; the unique index
+    # on it allows at most one active subscription per user on every backend
+    active_user_id = Column(Uuid(as_uuid=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
 
     # Relationships
     user = relationship("User", back_populates="subscriptions")
@@ -65,13 +75,14 @@ class UserSubscription(Base):
 class UserAPIKey(Base):
     __tablename__ = "user_api_keys"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     key_name = Column(String(100), nullable=False)
     api_key = Column(String(255), unique=True, nullable=False)
     is_active = Column(Boolean, default=True)
     rate_limit = Column(Integer, default=1000)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     last_used = Column(DateTime(timezone=True))
     expires_at = Column(DateTime(timezone=True))
 
@@ -1,7 +1,10 @@
 from pydantic import BaseModel, EmailStr, Field, validator
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List
+from operator import attrgetter
 from datetime import datetime
+from uuid import UUID
 from models.user import UserTier, SubscriptionStatus
+from core.config import settings
 from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
 
 
@@ -38,7 +41,7 @@ class UserUpdate(BaseModel):
 
 
 class UserResponse(UserBase):
-    id: str
+    id: UUID
     tier: UserTier
     is_active: bool
     email_verified: bool
@@ -50,6 +53,24 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class BulkUserCreate(BaseModel):
+    users: List[UserCreate] = Field(..., min_length=1, max_length=settings.BULK_REGISTER_MAX_USERS)
+
+
+class BulkUserResult(BaseModel):
+    index: int
+    email: str
+    status: str
+    id: Optional[UUID] = None
+    detail: Optional[str] = None
+
+
+class BulkUserResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkUserResult]
+
+
 # Authentication schemas
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -88,8 +109,8 @@ class SubscriptionUpdate(BaseModel):
 
 
 class SubscriptionResponse(SubscriptionBase):
-    id: str
-    user_id: str
+    id: UUID
+    user_id: UUID
     status: SubscriptionStatus
     start_date: datetime
     end_date: Optional[datetime]
@@ -97,3 +118,53 @@ class SubscriptionResponse(SubscriptionBase):
 
     class Config:
         from_attributes = True
+
+
+# API key schemas
+class APIKeyCreate(BaseModel):
+    key_name: str = Field(..., min_length=1, max_length=100)
+    expires_in_days: Optional[int] = Field(None, ge=1, le=3650)
+
+
+class APIKeyResponse(BaseModel):
+    id: UUID
+    key_name: str
+    is_active: bool
+    rate_limit: int
+    created_at: datetime
+    last_used: Optional[datetime]
+    expires_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class APIKeyCreatedResponse(APIKeyResponse):
+    api_key: str
+
+
+# Precompiled serializers for ORM objects loaded from our own database.
+# They copy the response fields without revalidating them; the result is
+# meant for ORJSONResponse, which encodes UUIDs, datetimes and enums natively.
+def _attribute_serializer(model: type) -> Callable[[Any], Dict[str, Any]]:
+    fields = tuple(model.model_fields)
+    getter = attrgetter(*fields)
+
+    def serialize(obj: Any) -> Dict[str, Any]:
+        return dict(zip(fields, getter(obj)))
+
+    return serialize
+
+
+serialize_user = _attribute_serializer(UserResponse)
+serialize_subscription = _attribute_serializer(SubscriptionResponse)
+serialize_api_key = _attribute_serializer(APIKeyResponse)
+
+
+def serialize_login(access_token: str, refresh_token: str, user: Any) -> Dict[str, Any]:
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "user": serialize_user(user),
+    }
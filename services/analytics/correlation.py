@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import time
+from typing import List, NamedTuple, Optional, Sequence
+import numpy as np
+from core.config import settings
+from services.analytics.prices import MAX_LAG_BARS, align_prices, load_prices
+from services.market_data.candles import TIMEFRAMES, CandleStore, candle_store
+from services.market_data.pairs import ALL_PAIRS
+
+logger = logging.getLogger(__name__)
+
+
+class RollingCorrelation:
+    """Pearson correlation of N series over their last ``window`` observations.
+
+    Keeps a ring buffer of observations with running sums and cross-products,
+    so each update costs O(N²) instead of the O(N²·W) of recomputing the
+    window. The sums are rebuilt exactly from the buffer once per window to
+    stop floating-point drift from accumulating; that keeps the amortized
+    cost O(N²). Observations should be centered near zero, like returns,
+    since the covariance is taken as a difference of sums.
+    """
+
+    def __init__(self, size: int, window: int):
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.size = size
+        self.window = window
+        self.reset()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def reset(self, rows: Optional[np.ndarray] = None) -> None:
+        """Clear the window, then fill it with the last ``window`` of ``rows`` (observations × series)."""
+        self._buffer = np.zeros((self.window, self.size))
+        self._sum = np.zeros(self.size)
+        self._cross = np.zeros((self.size, self.size))
+        self._count = 0
+        self._next = 0
+        self._since_rebuild = 0
+        if rows is not None and len(rows):
+            rows = np.asarray(rows, dtype=np.float64)[-self.window:]
+            self._buffer[:len(rows)] = rows
+            self._count = len(rows)
+            self._next = len(rows) % self.window
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        rows = self._buffer[:self._count]
+        self._sum = rows.sum(axis=0)
+        self._cross = rows.T @ rows
+        self._since_rebuild = 0
+
+    def update(self, observation: np.ndarray) -> None:
+        """Add one observation per series, evicting the oldest once the window is full."""
+        observation = np.asarray(observation, dtype=np.float64)
+        if self._count == self.window:
+            evicted = self._buffer[self._next]
+            self._sum -= evicted
+            self._cross -= np.outer(evicted, evicted)
+        else:
+            self._count += 1
+
+        self._buffer[self._next] = observation
+        self._sum += observation
+        self._cross += np.outer(observation, observation)
+        self._next = (self._next + 1) % self.window
+
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.window:
+            self._rebuild()
+
+    def matrix(self) -> np.ndarray:
+        """The N×N correlation matrix; rows and columns of series with no variance are NaN."""
+        if self._count < 2:
+            return np.full((self.size, self.size), np.nan)
+        result = self._cross - np.outer(self._sum, self._sum / self._count)
+        variance = result.diagonal().copy()
+        flat = variance <= 0.0
+        if flat.any():
+            variance[flat] = np.nan
+        scale = 1.0 / np.sqrt(variance)
+        result *= scale
+        result *= scale[:, None]
+        np.clip(result, -1.0, 1.0, out=result)
+        np.fill_diagonal(result, 1.0)
+        if flat.any():
+            result[flat, flat] = np.nan
+        return result
+
+
+class CorrelationSnapshot(NamedTuple):
+    pairs: List[str]
+    timeframe: str
+    window: int
+    count: int
+    ts: Optional[int]  # open time of the last bar included
+    matrix: np.ndarray
+    stale: List[str]  # pairs left out because their feed lags the others
+
+
+class CorrelationService:
+    """Rolling correlation of log returns between pairs, fed from the candle store.
+
+    Every worker reads the shared candle files, so each keeps its own engine
+    and folds in only bars that closed since it last looked. Bars are used
+    once every pair has them; a bar a pair never gets is skipped for all.
+    A pair whose feed stalls is dropped at the next warm-up rather than
+    holding the others back, and rejoins once it has caught up.
+    """
+
+    # Seconds between checks of the candle store for newly closed bars
+    REFRESH_INTERVAL = 1.0
+
+    def __init__(self, store: CandleStore, pairs: Sequence[str], timeframe: str, window: int):
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unknown timeframe {timeframe}")
+        self.store = store
+        self.candidates = list(pairs)
+        self.timeframe = timeframe
+        self.window = window
+        self.pairs: List[str] = []
+        self.stale: List[str] = []
+        self.engine: Optional[RollingCorrelation] = None
+        self._closes: Optional[np.ndarray] = None
+        self._last_ts: Optional[int] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _closed_before(self) -> int:
+        """Start of the bar still forming; everything earlier is closed."""
+        seconds = TIMEFRAMES[self.timeframe]
+        return int(time.time()) // seconds * seconds
+
+    def _warm_up(self, end: int) -> None:
+        prices = load_prices(self.store, self.candidates, self.timeframe, self.window + 1, end=end)
+        self.pairs = prices.pairs
+        self.stale = prices.stale
+        self.engine = RollingCorrelation(len(self.pairs), self.window)
+        if prices.ts.size:
+            self.engine.reset(np.diff(np.log(prices.close), axis=-1).T)
+            self._closes = prices.close[:, -1]
+            self._last_ts = int(prices.ts[-1])
+        self._matrix = None
+        logger.info("Correlation window loaded for %d pairs, %d bars", len(self.pairs), self.engine.count)
+
+    def _advance(self, end: int) -> None:
+        seconds = TIMEFRAMES[self.timeframe]
+        latest = [self.store.latest(pair, self.timeframe, end) for pair in self.pairs]
+        if not latest or None in latest:
+            self._warm_up(end)
+            return
+        cutoff = max(latest) - MAX_LAG_BARS * seconds
+        if min(latest) < cutoff:
+            # A pair stalled; carry on without it
+            self._warm_up(end)
+            return
+        stale_latest = [self.store.latest(pair, self.timeframe, end) for pair in self.stale]
+        if any(ts is not None and ts >= cutoff for ts in stale_latest):
+            # A stale pair caught up; bring it back in
+            self._warm_up(end)
+            return
+        if (max(latest) - self._last_ts) // seconds > self.window:
+            # Replaying more than a window of bars costs more than starting over
+            self._warm_up(end)
+            return
+
+        start = self._last_ts + seconds
+        stop = min(latest) + seconds
+        if start >= stop:
+            return
+        prices = align_prices([(pair, self.store.query(pair, self.timeframe, start, stop)) for pair in self.pairs])
+        if not prices.ts.size:
+            return
+
+        for closes in prices.close.T:
+            self.engine.update(np.log(closes / self._closes))
+            self._closes = closes
+        self._last_ts = int(prices.ts[-1])
+        self._matrix = None
+
+    def refresh(self) -> CorrelationSnapshot:
+        """Fold in newly closed bars and return the current matrix; blocking, so run it in a thread."""
+        now = time.monotonic()
+        if self.engine is None or now - self._checked_at >= self.REFRESH_INTERVAL:
+            end = self._closed_before()
+            if self.engine is None or self._last_ts is None:
+                self._warm_up(end)
+            else:
+                self._advance(end)
+            self._checked_at = now
+
+        if self._matrix is None:
+            self._matrix = self.engine.matrix()
+        return CorrelationSnapshot(
+            self.pairs, self.timeframe, self.window, self.engine.count, self._last_ts, self._matrix, self.stale
+        )
+
+    async def snapshot(self) -> CorrelationSnapshot:
+        async with self._lock:
+            return await asyncio.to_thread(self.refresh)
+
+
+correlation_service = CorrelationService(
+    candle_store, ALL_PAIRS, settings.CORRELATION_TIMEFRAME, settings.CORRELATION_WINDOW
+)
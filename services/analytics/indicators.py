@@ -0,0 +1,258 @@
+"""Technical indicators over batches of price series.
+
+Every function takes arrays shaped (pairs, bars), or a single 1-D series,
+and works along the last axis, so one call covers all pairs. Bars before an
+indicator has enough history are NaN. Inputs are expected to be NaN-free.
+"""
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+INDICATORS = ("returns", "sma", "ema", "rsi", "atr", "bollinger", "macd", "volatility")
+
+DEFAULT_PERIODS = {
+    "sma": 20,
+    "ema": 20,
+    "rsi": 14,
+    "atr": 14,
+    "bollinger": 20,
+    "volatility": 20,
+}
+
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+BOLLINGER_WIDTH = 2.0
+
+# Largest growth factor inside one block of _ewm; leaves ~1e200 of float64 headroom for prices
+_EWM_BLOCK_RANGE = 1e100
+
+
+def _as_2d(values: np.ndarray) -> np.ndarray:
+    return np.atleast_2d(np.asarray(values, dtype=np.float64))
+
+
+def _shape_like(result: np.ndarray, values: np.ndarray) -> np.ndarray:
+    return result[0] if np.ndim(values) == 1 else result
+
+
+def _nan_head(result: np.ndarray, count: int) -> np.ndarray:
+    result[..., :min(count, result.shape[-1])] = np.nan
+    return result
+
+
+def _rolling_sum(values: np.ndarray, period: int) -> np.ndarray:
+    """Sum of each trailing window; the first period-1 bars are NaN."""
+    result = np.cumsum(values, axis=-1)
+    # NumPy buffers the overlapping operands, so this reads the unmodified sums
+    np.subtract(result[..., period:], result[..., :-period], out=result[..., period:])
+    return _nan_head(result, period - 1)
+
+
+def _ewm(values: np.ndarray, alpha: float, seed: Optional[np.ndarray] = None,
+         out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Exponentially weighted mean y[t] = alpha*x[t] + (1-alpha)*y[t-1], with y[0] = seed or x[0].
+
+    The recurrence is solved in closed form per block,
+    y[t0+k] = d^(k+1)*y[t0-1] + alpha*d^k*cumsum(x*d^-j), with blocks short
+    enough that d^-j stays well inside float64 range. That turns a loop
+    over every bar into a loop over blocks of hundreds of bars.
+    """
+    decay = 1.0 - alpha
+    result = np.empty_like(values) if out is None else out
+    if values.shape[-1] == 0:
+        return result
+    result[..., 0] = values[..., 0] if seed is None else seed
+    if decay == 0.0:
+        result[..., 1:] = values[..., 1:]
+        return result
+
+    block = max(1, int(np.log(_EWM_BLOCK_RANGE) / -np.log(decay)))
+    powers = decay ** np.arange(block + 1, dtype=np.float64)
+    inverse = 1.0 / powers[:-1]
+    scaled = alpha * powers[:-1]
+
+    for start in range(1, values.shape[-1], block):
+        stop = min(start + block, values.shape[-1])
+        size = stop - start
+        chunk = result[..., start:stop]
+        np.multiply(values[..., start:stop], inverse[:size], out=chunk)
+        np.cumsum(chunk, axis=-1, out=chunk)
+        chunk *= scaled[:size]
+        chunk += powers[1:size + 1] * result[..., start - 1:start]
+    return result
+
+
+def _wilder(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's smoothing (alpha = 1/period), seeded with the mean of the first period values."""
+    result = np.empty_like(values)
+    _nan_head(result, period - 1)
+    if values.shape[-1] >= period:
+        _ewm(values[..., period - 1:], 1.0 / period, seed=values[..., :period].mean(axis=-1),
+             out=result[..., period - 1:])
+    return result
+
+
+def returns(close: np.ndarray, log: bool = True) -> np.ndarray:
+    """Bar-to-bar returns, logarithmic by default."""
+    values = _as_2d(close)
+    result = np.empty_like(values)
+    result[..., 0] = np.nan
+    if log:
+        result[..., 1:] = np.diff(np.log(values), axis=-1)
+    else:
+        result[..., 1:] = values[..., 1:] / values[..., :-1] - 1.0
+    return _shape_like(result, close)
+
+
+def sma(close: np.ndarray, period: int = DEFAULT_PERIODS["sma"]) -> np.ndarray:
+    values = _as_2d(close)
+    # Subtracting each row's first price keeps the running sum small and precise
+    offset = values[..., :1]
+    return _shape_like(_rolling_sum(values - offset, period) / period + offset, close)
+
+
+def ema(close: np.ndarray, period: int = DEFAULT_PERIODS["ema"]) -> np.ndarray:
+    """EMA with alpha = 2/(period+1), seeded at the first price; the first period-1 bars are NaN."""
+    values = _as_2d(close)
+    return _shape_like(_nan_head(_ewm(values, 2.0 / (period + 1)), period - 1), close)
+
+
+def _rolling_mean_std(values: np.ndarray, period: int):
+    """Mean and sample standard deviation of each trailing window, from two running sums."""
+    data = _as_2d(values)
+    # Centering on each row's first value keeps the sums small, limiting cancellation
+    offset = data[..., :1]
+    centered = data - offset
+    total = _rolling_sum(centered, period)
+    np.square(centered, out=centered)
+    variance = _rolling_sum(centered, period)
+    mean = total / period
+    total *= mean
+    variance -= total
+    variance /= period - 1
+    # Rounding can leave tiny negative variances in flat windows
+    np.maximum(variance, 0.0, out=variance)
+    mean += offset
+    return mean, np.sqrt(variance, out=variance)
+
+
+def rolling_std(values: np.ndarray, period: int) -> np.ndarray:
+    """Sample standard deviation of each trailing window."""
+    return _shape_like(_rolling_mean_std(values, period)[1], values)
+
+
+def rsi(close: np.ndarray, period: int = DEFAULT_PERIODS["rsi"]) -> np.ndarray:
+    """Wilder's RSI in [0, 100]."""
+    values = _as_2d(close)
+    delta = np.diff(values, axis=-1)
+    gain = _wilder(np.maximum(delta, 0.0), period)
+    np.negative(delta, out=delta)
+    loss = _wilder(np.maximum(delta, 0.0, out=delta), period)
+
+    # 100 - 100/(1 + gain/loss), rearranged to avoid dividing by a zero loss
+    total = gain + loss
+    result = np.empty_like(values)
+    result[..., 0] = np.nan
+    strength = result[..., 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(gain, total, out=strength)
+    strength *= 100.0
+    # Flat prices read as neutral
+    strength[total == 0.0] = 50.0
+    return _shape_like(result, close)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    highs, lows, closes = _as_2d(high), _as_2d(low), _as_2d(close)
+    result = highs - lows
+    previous = closes[..., :-1]
+    current = result[..., 1:]
+    gap = np.subtract(highs[..., 1:], previous)
+    np.maximum(current, np.abs(gap, out=gap), out=current)
+    np.subtract(lows[..., 1:], previous, out=gap)
+    np.maximum(current, np.abs(gap, out=gap), out=current)
+    return _shape_like(result, close)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+        period: int = DEFAULT_PERIODS["atr"]) -> np.ndarray:
+    """Wilder's average true range."""
+    return _shape_like(_wilder(_as_2d(true_range(high, low, close)), period), close)
+
+
+def bollinger(close: np.ndarray, period: int = DEFAULT_PERIODS["bollinger"],
+              width: float = BOLLINGER_WIDTH) -> Dict[str, np.ndarray]:
+    """Middle band (SMA) with upper and lower bands ``width`` standard deviations away."""
+    middle, spread = _rolling_mean_std(close, period)
+    spread *= width
+    bands = {"middle": middle, "upper": middle + spread, "lower": middle - spread}
+    return {name: _shape_like(band, close) for name, band in bands.items()}
+
+
+def macd(close: np.ndarray, fast: int = MACD_FAST, slow: int = MACD_SLOW,
+         signal: int = MACD_SIGNAL) -> Dict[str, np.ndarray]:
+    values = _as_2d(close)
+    line = _ewm(values, 2.0 / (fast + 1)) - _ewm(values, 2.0 / (slow + 1))
+    signal_line = _ewm(line, 2.0 / (signal + 1))
+    histogram = line - signal_line
+    result = {
+        "macd": _nan_head(line, slow - 1),
+        "signal": _nan_head(signal_line, slow + signal - 2),
+        "histogram": _nan_head(histogram, slow + signal - 2),
+    }
+    return {name: _shape_like(series, close) for name, series in result.items()}
+
+
+def volatility(close: np.ndarray, period: int = DEFAULT_PERIODS["volatility"],
+               periods_per_year: Optional[float] = None) -> np.ndarray:
+    """Rolling standard deviation of log returns, annualized when ``periods_per_year`` is given."""
+    changes = np.log(_as_2d(close))
+    changes[..., 1:] = np.diff(changes, axis=-1)
+    changes[..., 0] = 0.0
+    # The first return is undefined, so the first full window ends one bar later
+    result = _nan_head(_as_2d(rolling_std(changes, period)), period)
+    if periods_per_year:
+        result *= np.sqrt(periods_per_year)
+    return _shape_like(result, close)
+
+
+def warmup_bars(names: Iterable[str], period: Optional[int] = None) -> int:
+    """Bars of history needed before the first value of every requested indicator settles."""
+    needed = 1
+    for name in names:
+        if name == "macd":
+            # EMA seeds are forgotten after a few time constants
+            needed = max(needed, 3 * MACD_SLOW + MACD_SIGNAL)
+        elif name in ("ema", "rsi", "atr"):
+            needed = max(needed, 3 * (period or DEFAULT_PERIODS[name]))
+        elif name in DEFAULT_PERIODS:
+            needed = max(needed, (period or DEFAULT_PERIODS[name]) + 1)
+    return needed
+
+
+def compute(names: Iterable[str], high: np.ndarray, low: np.ndarray, close: np.ndarray,
+            period: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Compute several indicators at once; multi-line indicators are flattened as ``name.line``."""
+    results: Dict[str, np.ndarray] = {}
+    for name in names:
+        if name == "returns":
+            results[name] = returns(close)
+        elif name == "sma":
+            results[name] = sma(close, period or DEFAULT_PERIODS[name])
+        elif name == "ema":
+            results[name] = ema(close, period or DEFAULT_PERIODS[name])
+        elif name == "rsi":
+            results[name] = rsi(close, period or DEFAULT_PERIODS[name])
+        elif name == "atr":
+            results[name] = atr(high, low, close, period or DEFAULT_PERIODS[name])
+        elif name == "volatility":
+            results[name] = volatility(close, period or DEFAULT_PERIODS[name])
+        elif name == "bollinger":
+            for line, values in bollinger(close, period or DEFAULT_PERIODS[name]).items():
+                results[f"{name}.{line}"] = values
+        elif name == "macd":
+            for line, values in macd(close).items():
+                results[f"{name}.{line}"] = values
+        else:
+            raise ValueError(f"Unknown indicator {name}")
+    return results
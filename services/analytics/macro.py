@@ -0,0 +1,29 @@
+from typing import List, Sequence, Tuple
+import numpy as np
+from services.market_data.pairs import split_pair
+
+
+def currency_exposure(pairs: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    """Currencies in ``pairs`` and a (currencies, pairs) matrix of +1 for base, -1 for quote."""
+    currencies = sorted({currency for pair in pairs for currency in split_pair(pair)})
+    index = {currency: i for i, currency in enumerate(currencies)}
+    exposure = np.zeros((len(currencies), len(pairs)))
+    for column, pair in enumerate(pairs):
+        base, quote = split_pair(pair)
+        exposure[index[base], column] = 1.0
+        exposure[index[quote], column] = -1.0
+    return currencies, exposure
+
+
+def currency_strength(pairs: Sequence[str], pair_returns: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    """Cumulative strength of each currency against the others it is quoted with.
+
+    ``pair_returns`` is (pairs, bars) of log returns, NaN where undefined. A
+    currency's strength at each bar is the mean cumulative return of its
+    pairs, signed by whether it is the base or the quote currency, so the
+    whole cross-section is one matrix product.
+    """
+    currencies, exposure = currency_exposure(pairs)
+    cumulative = np.cumsum(np.nan_to_num(pair_returns), axis=-1)
+    counts = np.abs(exposure).sum(axis=1, keepdims=True)
+    return currencies, exposure @ cumulative / counts
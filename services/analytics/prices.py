@@ -0,0 +1,72 @@
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from services.market_data.candles import TIMEFRAMES, CandleStore
+
+# Bars read per requested bar, so pairs missing a few bars the others have still share ``bars``
+_SPAN_SLACK = 2
+
+# Pairs whose newest bar is further than this behind the freshest pair are left out as stale
+MAX_LAG_BARS = 3
+
+
+class PriceMatrix(NamedTuple):
+    """Candles for several pairs on shared timestamps, one row per pair."""
+    pairs: List[str]
+    ts: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    stale: List[str]  # stored pairs left out because their feed lags the others
+
+
+def align_prices(loaded: Sequence[Tuple[str, np.ndarray]], bars: Optional[int] = None) -> PriceMatrix:
+    """Restrict each pair's candles to the timestamps all of them share, keeping the last ``bars``."""
+    if not loaded:
+        empty = np.empty((0, 0))
+        return PriceMatrix([], np.empty(0, dtype=np.int64), empty, empty, empty, [])
+
+    common = np.array(loaded[0][1]["ts"])
+    for _, candles in loaded[1:]:
+        common = np.intersect1d(common, candles["ts"], assume_unique=True)
+    if bars is not None:
+        common = common[-bars:]
+
+    rows = [candles[np.searchsorted(candles["ts"], common)] for _, candles in loaded]
+    return PriceMatrix(
+        [pair for pair, _ in loaded],
+        common,
+        np.array([row["high"] for row in rows], dtype=np.float64).reshape(len(rows), -1),
+        np.array([row["low"] for row in rows], dtype=np.float64).reshape(len(rows), -1),
+        np.array([row["close"] for row in rows], dtype=np.float64).reshape(len(rows), -1),
+        [],
+    )
+
+
+def load_prices(store: CandleStore, pairs: Sequence[str], timeframe: str, bars: int,
+                end: Optional[int] = None) -> PriceMatrix:
+    """The last ``bars`` bars before ``end`` that every stored pair has in common.
+
+    Pairs without any candles are left out of the result, and so are pairs
+    more than MAX_LAG_BARS behind the freshest one, which would otherwise
+    pin every pair to their last bar; those are listed in ``stale``.
+    """
+    latest = {}
+    for pair in pairs:
+        ts = store.latest(pair, timeframe, end)
+        if ts is not None:
+            latest[pair] = ts
+    if not latest:
+        return align_prices([])
+
+    cutoff = max(latest.values()) - MAX_LAG_BARS * TIMEFRAMES[timeframe]
+    fresh = [pair for pair in latest if latest[pair] >= cutoff]
+    # Read every pair up to the same bar so their tails line up
+    stop = min(latest[pair] for pair in fresh) + TIMEFRAMES[timeframe]
+    if end is not None:
+        stop = min(stop, end)
+    loaded = []
+    for pair in fresh:
+        start = store.tail_start(pair, timeframe, bars * _SPAN_SLACK, stop)
+        loaded.append((pair, store.query(pair, timeframe, start, stop)))
+
+    return align_prices(loaded, bars)._replace(stale=[pair for pair in latest if latest[pair] < cutoff])
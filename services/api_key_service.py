@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import logging
+import secrets
+import uuid
+from collections import OrderedDict
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, status
+from core.cache import TTLCache
+from core.config import settings
+from core.database import AsyncSessionLocal
+from models.user import UserAPIKey
+from schemas.user import APIKeyCreate
+
+logger = logging.getLogger(__name__)
+
+API_KEY_PREFIX = "fxk_"
+WATERMARK_OVERLAP = timedelta(seconds=1)
+
+
+def generate_api_key() -> str:
+    """Generate a new plaintext API key."""
+    return API_KEY_PREFIX + secrets.token_urlsafe(32)
+
+
+def hash_api_key(api_key: str) -> str:
+    """Hash an API key for storage and lookup.
+
+    Keys are 256-bit random tokens, so a fast unsalted digest is sufficient
+    and keeps the per-request lookup cheap; plaintext keys are never stored.
+    """
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+class APIKeyEntry:
+    """The parts of an active API key needed to authenticate a request."""
+
+    __slots__ = ("id", "user_id", "rate_limit", "expires_at")
+
+    def __init__(self, key: UserAPIKey):
+        self.id = key.id
+        self.user_id = key.user_id
+        self.rate_limit = key.rate_limit
+        self.expires_at = key.expires_at
+
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= datetime.utcnow()
+
+
+class APIKeyIndex:
+    """Bounded in-memory index of active API keys, keyed by key hash.
+
+    Misses fall back to a single-row lookup; unknown hashes are remembered
+    briefly so bogus keys cannot turn into a query per request. A background
+    task pulls keys created or changed since the last refresh, which is how
+    revocations made by other workers arrive.
+    """
+
+    def __init__(self, max_size: int, refresh_interval: float):
+        self.max_size = max_size
+        self.refresh_interval = refresh_interval
+        self._entries: "OrderedDict[str, APIKeyEntry]" = OrderedDict()
+        self._hash_by_id: Dict[uuid.UUID, str] = {}
+        self._unknown = TTLCache(max_size=max_size, ttl=refresh_interval)
+        self._watermark: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _put(self, key_hash: str, entry: APIKeyEntry) -> None:
+        self._entries[key_hash] = entry
+        self._entries.move_to_end(key_hash)
+        self._hash_by_id[entry.id] = key_hash
+        self._unknown.invalidate(key_hash)
+        while len(self._entries) > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._hash_by_id.pop(evicted.id, None)
+
+    def add(self, key: UserAPIKey) -> None:
+        """Index an active key, replacing any previous entry for it."""
+        self._put(key.api_key, APIKeyEntry(key))
+
+    def remove(self, key_id: uuid.UUID) -> None:
+        """Drop a key, e.g. after it was revoked."""
+        key_hash = self._hash_by_id.pop(key_id, None)
+        if key_hash is not None:
+            self._entries.pop(key_hash, None)
+
+    async def lookup(self, api_key: str, db: AsyncSession) -> Optional[APIKeyEntry]:
+        """Resolve a plaintext key to its entry, or None if unknown, revoked or expired."""
+        key_hash = hash_api_key(api_key)
+        entry = self._entries.get(key_hash)
+        if entry is None:
+            if self._unknown.get(key_hash) is not None:
+                return None
+            stmt = select(UserAPIKey).where(UserAPIKey.api_key == key_hash, UserAPIKey.is_active.is_(True))
+            key = (await db.execute(stmt)).scalars().first()
+            if key is None:
+                self._unknown.set(key_hash, True)
+                return None
+            entry = APIKeyEntry(key)
+            self._put(key_hash, entry)
+        else:
+            self._entries.move_to_end(key_hash)
+
+        if entry.is_expired():
+            self.remove(entry.id)
+            return None
+        return entry
+
+    async def load(self) -> None:
+        """Fill the index with the most recently created active keys."""
+        async with AsyncSessionLocal() as session:
+            self._watermark = (await session.execute(select(func.now()))).scalar()
+            stmt = (
+                select(UserAPIKey)
+                .where(UserAPIKey.is_active.is_(True))
+                .order_by(UserAPIKey.created_at.desc())
+                .limit(self.max_size)
+            )
+            for key in (await session.execute(stmt)).scalars():
+                entry = APIKeyEntry(key)
+                if not entry.is_expired():
+                    self._put(key.api_key, entry)
+
+    async def refresh(self) -> None:
+        """Apply keys created or changed since the previous refresh."""
+        if self._watermark is None:
+            await self.load()
+            return
+
+        async with AsyncSessionLocal() as session:
+            # Read the database clock first so nothing changed during the query is missed,
+            # and overlap the previous window since timestamp columns may round to seconds
+            watermark = (await session.execute(select(func.now()))).scalar()
+            since = self._watermark - WATERMARK_OVERLAP
+            stmt = select(UserAPIKey).where(or_(
+                UserAPIKey.created_at >= since,
+                UserAPIKey.updated_at >= since
+            ))
+            for key in (await session.execute(stmt)).scalars():
+                entry = APIKeyEntry(key)
+                if key.is_active and not entry.is_expired():
+                    self._put(key.api_key, entry)
+                else:
+                    self.remove(key.id)
+            self._watermark = watermark
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("API key index refresh failed")
+
+    async def start(self) -> None:
+        """Load the index and start incremental refreshes."""
+        try:
+            await self.load()
+        except Exception:
+            logger.exception("API key index load failed; keys will be loaded on demand")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+api_key_index = APIKeyIndex(
+    max_size=settings.API_KEY_INDEX_MAX_SIZE,
+    refresh_interval=settings.API_KEY_INDEX_REFRESH_INTERVAL
+)
+
+
+class APIKeyService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_api_key(self, user_id: uuid.UUID, key_data: APIKeyCreate) -> tuple:
+        """Create an API key, returning the stored key and its plaintext value."""
+        plaintext = generate_api_key()
+        expires_at = None
+        if key_data.expires_in_days:
+            expires_at = datetime.utcnow() + timedelta(days=key_data.expires_in_days)
+
+        key = UserAPIKey(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            key_name=key_data.key_name,
+            api_key=hash_api_key(plaintext),
+            is_active=True,
+            rate_limit=settings.API_KEY_DEFAULT_RATE_LIMIT,
+            created_at=datetime.utcnow(),
+            last_used=None,
+            expires_at=expires_at
+        )
+
+        self.db.add(key)
+        await self.db.commit()
+        api_key_index.add(key)
+
+        return key, plaintext
+
+    async def get_user_api_keys(self, user_id: uuid.UUID) -> List[UserAPIKey]:
+        """Get all API keys for a user."""
+        stmt = select(UserAPIKey).where(UserAPIKey.user_id == user_id)
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def revoke_api_key(self, user_id: uuid.UUID, key_id: uuid.UUID) -> UserAPIKey:
+        """Revoke one of a user's API keys."""
+        stmt = select(UserAPIKey).where(UserAPIKey.id == key_id, UserAPIKey.user_id == user_id)
+        key = (await self.db.execute(stmt)).scalars().first()
+
+        if not key:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="API key not found"
+            )
+
+        key.is_active = False
+        await self.db.commit()
+        api_key_index.remove(key.id)
+
+        return key
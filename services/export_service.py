@@ -0,0 +1,135 @@
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Optional
+import orjson
+from sqlalchemy import Select, select
+from core.config import settings
+from core.database import ReadSessionLocal
+from models.user import User, UserSubscription, UserTier, SubscriptionStatus
+
+# Exported columns; password hashes and free-form preferences are never exported
+USER_EXPORT_COLUMNS = (
+    User.id, User.email, User.username, User.first_name, User.last_name, User.tier,
+    User.is_active, User.email_verified, User.created_at, User.updated_at, User.last_login, User.timezone,
+)
+SUBSCRIPTION_EXPORT_COLUMNS = (
+    UserSubscription.id, UserSubscription.user_id, UserSubscription.tier, UserSubscription.status,
+    UserSubscription.start_date, UserSubscription.end_date, UserSubscription.auto_renew,
+    UserSubscription.payment_method_id, UserSubscription.created_at, UserSubscription.updated_at,
+)
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def user_export_query(
+        tier: Optional[UserTier] = None,
+        is_active: Optional[bool] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+) -> Select:
+    """Build the filtered users export query."""
+    stmt = select(*USER_EXPORT_COLUMNS)
+    if tier is not None:
+        stmt = stmt.where(User.tier == tier)
+    if is_active is not None:
+        stmt = stmt.where(User.is_active.is_(is_active))
+    if created_after is not None:
+        stmt = stmt.where(User.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(User.created_at < created_before)
+    return stmt
+
+
+def subscription_export_query(
+        tier: Optional[UserTier] = None,
+        subscription_status: Optional[SubscriptionStatus] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+) -> Select:
+    """Build the filtered subscriptions export query."""
+    stmt = select(*SUBSCRIPTION_EXPORT_COLUMNS)
+    if tier is not None:
+        stmt = stmt.where(UserSubscription.tier == tier)
+    if subscription_status is not None:
+        stmt = stmt.where(UserSubscription.status == subscription_status)
+    if created_after is not None:
+        stmt = stmt.where(UserSubscription.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(UserSubscription.created_at < created_before)
+    return stmt
+
+
+async def iter_export_rows(stmt: Select, key_column, page_size: int, batch_size: int) -> AsyncIterator[list]:
+    """Yield lists of row mappings for ``stmt`` in primary-key order.
+
+    Pages are fetched with keyset pagination on ``key_column``, each in its
+    own short-lived session so a long export never pins one transaction,
+    and rows within a page are read from a server-side cursor in batches.
+    """
+    last_key = None
+    while True:
+        page = stmt.order_by(key_column).limit(page_size)
+        if last_key is not None:
+            page = page.where(key_column > last_key)
+
+        fetched = 0
+        async with ReadSessionLocal() as session:
+            result = await session.stream(page.execution_options(yield_per=batch_size))
+            async for partition in result.mappings().partitions():
+                fetched += len(partition)
+                last_key = partition[-1][key_column.key]
+                yield partition
+
+        if fetched < page_size:
+            return
+
+
+def _csv_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def stream_export(
+        stmt: Select,
+        key_column,
+        export_format: ExportFormat,
+        page_size: Optional[int] = None,
+        batch_size: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """Encode an export as NDJSON or CSV, one chunk per fetched batch."""
+    rows = iter_export_rows(
+        stmt, key_column,
+        page_size or settings.EXPORT_PAGE_SIZE,
+        batch_size or settings.EXPORT_BATCH_SIZE
+    )
+
+    if export_format is ExportFormat.NDJSON:
+        async for batch in rows:
+            yield b"".join(orjson.dumps(dict(row)) + b"\n" for row in batch)
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in stmt.selected_columns])
+    async for batch in rows:
+        writer.writerows([_csv_value(value) for value in row.values()] for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
@@ -0,0 +1,66 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import delete, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from core.database import AsyncSessionLocal
+from models.lease import SchedulerLease
+
+
+class DatabaseLease:
+    """A named lease in scheduler_leases so only one worker runs a periodic job.
+
+    The holder extends it while working; if the holder dies, another worker
+    can take it over once ``ttl`` seconds have passed.
+    """
+
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = timedelta(seconds=ttl)
+        self._owner = None
+        self._owner_pid = None
+
+    @property
+    def owner(self) -> str:
+        """Identity of this process; rebuilt after a fork so preloaded workers don't share it."""
+        pid = os.getpid()
+        if self._owner_pid != pid:
+            self._owner = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}"
+            self._owner_pid = pid
+        return self._owner
+
+    async def acquire(self) -> bool:
+        """Take or extend the lease; False if another worker holds it."""
+        now = datetime.utcnow()
+        expires_at = now + self.ttl
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == self.name,
+                    or_(SchedulerLease.owner == self.owner, SchedulerLease.expires_at < now)
+                )
+                .values(owner=self.owner, expires_at=expires_at)
+            )
+            if result.rowcount == 1:
+                await session.commit()
+                return True
+
+            try:
+                await session.execute(
+                    insert(SchedulerLease).values(name=self.name, owner=self.owner, expires_at=expires_at)
+                )
+                await session.commit()
+                return True
+            except IntegrityError:
+                # Held by a live worker
+                await session.rollback()
+                return False
+
+    async def release(self) -> None:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                delete(SchedulerLease).where(SchedulerLease.name == self.name, SchedulerLease.owner == self.owner)
+            )
+            await session.commit()
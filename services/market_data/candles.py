@@ -0,0 +1,271 @@
+import asyncio
+import bisect
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from core.config import settings
+from services.market_data.providers import Quote
+
+logger = logging.getLogger(__name__)
+
+# float32 keeps 7 significant digits, enough for 5-decimal FX quotes (JPY pairs included)
+CANDLE_DTYPE = np.dtype([
+    ("ts", "<i8"),  # bar open time, epoch seconds UTC
+    ("open", "<f4"),
+    ("high", "<f4"),
+    ("low", "<f4"),
+    ("close", "<f4"),
+    ("volume", "<f4"),  # tick count for quote-built bars
+])
+
+TIMEFRAMES = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "H1": 3600,
+    "H4": 14400,
+    "D1": 86400,
+}
+
+BASE_TIMEFRAME = "M1"
+
+
+def empty_candles() -> np.ndarray:
+    return np.empty(0, dtype=CANDLE_DTYPE)
+
+
+def resample(candles: np.ndarray, timeframe: str) -> np.ndarray:
+    """Aggregate candles into ``timeframe`` buckets without a Python-level loop.
+
+    Buckets are aligned to the epoch, so D1 bars start at 00:00 UTC.
+    """
+    seconds = TIMEFRAMES[timeframe]
+    if not len(candles):
+        return empty_candles()
+
+    buckets = candles["ts"] // seconds * seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(candles)] - 1
+
+    result = np.empty(len(starts), dtype=CANDLE_DTYPE)
+    result["ts"] = buckets[starts]
+    result["open"] = candles["open"][starts]
+    result["high"] = np.maximum.reduceat(candles["high"], starts)
+    result["low"] = np.minimum.reduceat(candles["low"], starts)
+    result["close"] = candles["close"][ends]
+    result["volume"] = np.add.reduceat(candles["volume"], starts)
+    return result
+
+
+class CandleSeries:
+    """One append-only candle file, read through a memory map.
+
+    The file is a bare array of CANDLE_DTYPE records in timestamp order, so
+    its length is its row count and readers in other processes see appends
+    as soon as the file grows.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map: Optional[np.memmap] = None
+        self._mapped_size = 0
+
+    def _size(self) -> int:
+        try:
+            return os.stat(self.path).st_size
+        except FileNotFoundError:
+            return 0
+
+    def view(self) -> np.ndarray:
+        """All rows, read-only; remapped only when the file has grown."""
+        size = self._size() // CANDLE_DTYPE.itemsize * CANDLE_DTYPE.itemsize
+        if size == 0:
+            return empty_candles()
+        if self._map is None or size != self._mapped_size:
+            self._map = np.memmap(self.path, dtype=CANDLE_DTYPE, mode="r", shape=(size // CANDLE_DTYPE.itemsize,))
+            self._mapped_size = size
+        return self._map
+
+    def range(self, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """Rows with start <= ts < end as a zero-copy slice of the map.
+
+        Bisects the strided ts field directly: np.searchsorted would first copy
+        the whole column into a contiguous buffer, touching every page.
+        """
+        rows = self.view()
+        ts = rows["ts"]
+        lo = 0 if start is None else bisect.bisect_left(ts, start)
+        hi = len(rows) if end is None else bisect.bisect_left(ts, end, lo)
+        return rows[lo:hi]
+
+    def append(self, candles: np.ndarray) -> int:
+        """Append candles newer than the last row; a bar with the last row's ts replaces it.
+
+        Returns the number of rows written. There must be a single writer per
+        series (the ingestion worker holding the poll lease).
+        """
+        if not len(candles):
+            return 0
+        if np.any(np.diff(candles["ts"]) <= 0):
+            raise ValueError("candles must be in strictly increasing ts order")
+
+        rows = self.view()
+        written = 0
+        if len(rows):
+            last_ts = int(rows["ts"][-1])
+            if int(candles["ts"][0]) < last_ts:
+                candles = candles[candles["ts"] >= last_ts]
+                if not len(candles):
+                    return 0
+            if int(candles["ts"][0]) == last_ts:
+                # Update the still-forming bar in place
+                with open(self.path, "r+b") as f:
+                    f.seek((len(rows) - 1) * CANDLE_DTYPE.itemsize)
+                    f.write(candles[:1].astype(CANDLE_DTYPE, copy=False).tobytes())
+                candles = candles[1:]
+                written = 1
+
+        if len(candles):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(candles.astype(CANDLE_DTYPE, copy=False).tobytes())
+            written += len(candles)
+        return written
+
+
+class CandleStore:
+    """Per-pair, per-timeframe candle files under one directory.
+
+    Only M1 is written by ingestion; higher timeframes are resampled from
+    it on read unless a file for that timeframe has been written as well
+    (e.g. by a historical backfill).
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._series: Dict[Tuple[str, str], CandleSeries] = {}
+        # Bars being built from live quotes: pair -> one-row array
+        self._forming: Dict[str, np.ndarray] = {}
+
+    def series(self, pair: str, timeframe: str = BASE_TIMEFRAME) -> CandleSeries:
+        key = (pair, timeframe)
+        series = self._series.get(key)
+        if series is None:
+            series = CandleSeries(os.path.join(self.root, pair, f"{timeframe}.bin"))
+            self._series[key] = series
+        return series
+
+    def pairs(self) -> List[str]:
+        try:
+            return sorted(entry.name for entry in os.scandir(self.root) if entry.is_dir())
+        except FileNotFoundError:
+            return []
+
+    def append(self, pair: str, candles: np.ndarray, timeframe: str = BASE_TIMEFRAME) -> int:
+        return self.series(pair, timeframe).append(candles)
+
+    def _source(self, pair: str, timeframe: str) -> Tuple[CandleSeries, bool]:
+        """The series ``timeframe`` is read from, and whether it needs resampling."""
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unknown timeframe {timeframe}")
+        stored = self.series(pair, timeframe)
+        if timeframe == BASE_TIMEFRAME or stored.view().size:
+            return stored, False
+        return self.series(pair, BASE_TIMEFRAME), True
+
+    def query(self, pair: str, timeframe: str = BASE_TIMEFRAME,
+              start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """Candles with start <= ts < end.
+
+        Stored timeframes come back as zero-copy slices of the map; others are
+        resampled from M1, widening ``start`` to a bucket boundary so the
+        first bar is complete.
+        """
+        source, resampled = self._source(pair, timeframe)
+        if not resampled:
+            return source.range(start, end)
+
+        seconds = TIMEFRAMES[timeframe]
+        if start is not None:
+            start = start // seconds * seconds
+        return resample(source.range(start, end), timeframe)
+
+    def latest(self, pair: str, timeframe: str = BASE_TIMEFRAME, end: Optional[int] = None) -> Optional[int]:
+        """Open time of the newest ``timeframe`` bar before ``end``; None if there is none."""
+        ts = self._source(pair, timeframe)[0].view()["ts"]
+        stop = len(ts) if end is None else bisect.bisect_left(ts, end)
+        if stop == 0:
+            return None
+        seconds = TIMEFRAMES[timeframe]
+        return int(ts[stop - 1]) // seconds * seconds
+
+    def tail_start(self, pair: str, timeframe: str, bars: int, end: Optional[int] = None) -> Optional[int]:
+        """Open time of the first of the last ``bars`` ``timeframe`` bars before ``end``; None if there are none.
+
+        Counts the bars actually stored by walking back over the ts column
+        alone, so market closures and stale feeds widen the span instead of
+        leaving it short, and nothing is resampled.
+        """
+        source, resampled = self._source(pair, timeframe)
+        ts = source.view()["ts"]
+        stop = len(ts) if end is None else bisect.bisect_left(ts, end)
+        if stop == 0:
+            return None
+
+        seconds = TIMEFRAMES[timeframe]
+        # Rows per bar when no minute is missing; sparser data just takes another pass
+        span = bars * (seconds // TIMEFRAMES[BASE_TIMEFRAME] if resampled else 1)
+        while True:
+            lo = max(0, stop - span)
+            buckets = np.asarray(ts[lo:stop]) // seconds
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+            if len(starts) >= bars or lo == 0:
+                return int(buckets[starts[-min(bars, len(starts))]]) * seconds
+            span *= 2
+
+    def _start_bar(self, pair: str, ts: int, price: float) -> np.ndarray:
+        """A new forming bar, continuing the stored one for ``ts`` if another run already began it."""
+        rows = self.series(pair).view()
+        if len(rows) and int(rows["ts"][-1]) == ts:
+            # Restarted or took over the poll lease mid-minute; keep its open, range and volume
+            bar = np.array(rows[-1:])
+            bar["high"] = max(float(bar["high"][0]), price)
+            bar["low"] = min(float(bar["low"][0]), price)
+            bar["close"] = price
+            return bar
+        return np.array([(ts, price, price, price, price, 0)], dtype=CANDLE_DTYPE)
+
+    def _write_bars(self, bars: Dict[str, np.ndarray]) -> None:
+        for pair, candles in bars.items():
+            try:
+                self.append(pair, candles)
+            except (OSError, ValueError):
+                logger.exception("Could not store candles for %s", pair)
+
+    async def ingest_quotes(self, quotes: Iterable[Quote]) -> None:
+        """Fold quote mids into M1 bars and persist them; used as a QuotePoller handler.
+
+        The poll's bars are built first, then written in one go off the event loop.
+        """
+        touched: Dict[str, Dict[int, np.ndarray]] = {}
+        for quote in quotes:
+            ts = int(quote.timestamp.timestamp()) // 60 * 60
+            price = quote.mid
+            bar = self._forming.get(quote.pair)
+            if bar is None or int(bar["ts"][0]) != ts:
+                bar = self._start_bar(quote.pair, ts, price)
+                self._forming[quote.pair] = bar
+            else:
+                bar["high"] = max(float(bar["high"][0]), price)
+                bar["low"] = min(float(bar["low"][0]), price)
+                bar["close"] = price
+            bar["volume"] += 1
+            touched.setdefault(quote.pair, {})[ts] = bar
+
+        if touched:
+            # Concatenating copies the bars, so the next poll cannot change them mid-write
+            bars = {pair: np.concatenate([by_ts[ts] for ts in sorted(by_ts)]) for pair, by_ts in touched.items()}
+            await asyncio.to_thread(self._write_bars, bars)
+
+candle_store = CandleStore(settings.CANDLE_STORE_DIR)
@@ -0,0 +1,20 @@
+"""Currency pairs we ingest, as six-letter codes (base + quote)."""
+
+MAJORS = (
+    "EURUSD", "GBPUSD", "USDJPY", "USDCHF", "AUDUSD", "USDCAD", "NZDUSD",
+)
+
+CROSSES = (
+    "EURGBP", "EURJPY", "EURCHF", "EURAUD", "EURCAD", "EURNZD",
+    "GBPJPY", "GBPCHF", "GBPAUD", "GBPCAD", "GBPNZD",
+    "AUDJPY", "AUDCHF", "AUDCAD", "AUDNZD",
+    "NZDJPY", "NZDCHF", "NZDCAD",
+    "CADJPY", "CADCHF", "CHFJPY",
+)
+
+ALL_PAIRS = MAJORS + CROSSES
+
+
+def split_pair(pair: str) -> tuple:
+    """Split "EURUSD" into ("EUR", "USD")."""
+    return pair[:3], pair[3:]
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Awaitable, Callable, List, Optional
+from core.config import settings
+from services.lease import DatabaseLease
+from services.market_data.candles import candle_store
+from services.market_data.pairs import ALL_PAIRS
+from services.market_data.providers import Quote
+from services.market_data.service import MarketDataService, market_data_service
+
+logger = logging.getLogger(__name__)
+
+QuoteHandler = Callable[[List[Quote]], Awaitable[None]]
+
+
+class QuotePoller:
+    """Poll one provider for a fixed set of pairs on an interval.
+
+    The interval is stretched if it would exceed the provider's request
+    budget, and a database lease keeps other workers from polling the same
+    provider and multiplying quota usage.
+    """
+
+    def __init__(self, service: MarketDataService, provider_name: str, pairs: List[str], interval: float,
+                 lease_ttl: Optional[float] = None):
+        self.service = service
+        self.provider_name = provider_name
+        self.pairs = list(pairs)
+        self.interval = max(interval, self.min_interval)
+        if self.interval > interval:
+            logger.warning(
+                "Polling %d pairs from %s every %.1fs would exceed its quota; polling every %.1fs",
+                len(self.pairs), provider_name, interval, self.interval
+            )
+        self.lease = DatabaseLease(f"market-data-poll:{provider_name}", lease_ttl or max(30.0, self.interval * 3))
+        self._handlers: List[QuoteHandler] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def min_interval(self) -> float:
+        """Shortest interval that keeps one poll per interval within the request budget."""
+        provider = self.service.providers[self.provider_name]
+        requests_per_poll = len(provider.requests_for(self.pairs))
+        return requests_per_poll * 60 / provider.requests_per_minute
+
+    def add_handler(self, handler: QuoteHandler) -> None:
+        """Call ``handler`` with every batch of fetched quotes."""
+        self._handlers.append(handler)
+
+    async def poll(self) -> List[Quote]:
+        quotes = await self.service.fetch_quotes(self.provider_name, self.pairs)
+        for handler in self._handlers:
+            try:
+                await handler(quotes)
+            except Exception:
+                logger.exception("Quote handler failed")
+        return quotes
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                if await self.lease.acquire():
+                    await self.poll()
+            except Exception:
+                logger.exception("Quote poll for %s failed", self.provider_name)
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            with suppress(Exception):
+                await self.lease.release()
+
+
+quote_poller = QuotePoller(
+    market_data_service,
+    settings.MARKET_DATA_PROVIDER,
+    settings.MARKET_DATA_PAIRS or list(ALL_PAIRS),
+    settings.MARKET_DATA_POLL_INTERVAL
+)
+quote_poller.add_handler(candle_store.ingest_quotes)
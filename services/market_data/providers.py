@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from services.market_data.pairs import split_pair
+
+
+@dataclass(frozen=True)
+class Quote:
+    pair: str
+    bid: float
+    ask: float
+    timestamp: datetime
+    provider: str
+
+    @property
+    def mid(self) -> float:
+        return (self.bid + self.ask) / 2
+
+
+@dataclass(frozen=True)
+class ProviderRequest:
+    """One HTTP GET against a provider and the pairs it answers."""
+
+    path: str
+    params: Tuple[Tuple[str, str], ...]
+    pairs: Tuple[str, ...]
+
+    @property
+    def key(self) -> tuple:
+        """Identity used to coalesce identical in-flight requests."""
+        return self.path, self.params
+
+
+class ProviderError(Exception):
+    """A provider answered with something we cannot use."""
+
+
+class ProviderRateLimited(ProviderError):
+    """The provider rejected the request for exceeding its quota."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Provider:
+    """Describes how to ask one market-data vendor for quotes and read the answer."""
+
+    name = "provider"
+
+    def __init__(self, base_url: str, api_key: Optional[str], max_concurrency: int, requests_per_minute: float):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {}
+
+    def requests_for(self, pairs: List[str]) -> List[ProviderRequest]:
+        raise NotImplementedError
+
+    def parse(self, request: ProviderRequest, payload: dict) -> List[Quote]:
+        raise NotImplementedError
+
+
+def _parse_time(value: str) -> datetime:
+    # OANDA sends nanosecond precision ("...T10:00:00.123456789Z"), more than fromisoformat accepts
+    value = value.rstrip("Z")
+    if "." in value:
+        head, fraction = value.split(".", 1)
+        value = f"{head}.{fraction[:6]}"
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class AlphaVantageProvider(Provider):
+    """CURRENCY_EXCHANGE_RATE, one request per pair."""
+
+    name = "alpha_vantage"
+
+    def requests_for(self, pairs: List[str]) -> List[ProviderRequest]:
+        requests = []
+        for pair in pairs:
+            base, quote = split_pair(pair)
+            params = (
+                ("function", "CURRENCY_EXCHANGE_RATE"),
+                ("from_currency", base),
+                ("to_currency", quote),
+                ("apikey", self.api_key or ""),
+            )
+            requests.append(ProviderRequest("/query", params, (pair,)))
+        return requests
+
+    def parse(self, request: ProviderRequest, payload: dict) -> List[Quote]:
+        # Quota errors arrive as HTTP 200 with a "Note" or "Information" message
+        if "Note" in payload or "Information" in payload:
+            raise ProviderRateLimited(payload.get("Note") or payload.get("Information"))
+
+        data = payload.get("Realtime Currency Exchange Rate")
+        if not data:
+            raise ProviderError(payload.get("Error Message", "Unexpected Alpha Vantage response"))
+
+        rate = float(data["5. Exchange Rate"])
+        bid = float(data.get("8. Bid Price") or rate)
+        ask = float(data.get("9. Ask Price") or rate)
+        return [Quote(request.pairs[0], bid, ask, _parse_time(data["6. Last Refreshed"]), self.name)]
+
+
+class OandaProvider(Provider):
+    """v20 pricing endpoint; one request covers many instruments."""
+
+    name = "oanda"
+    max_instruments_per_request = 50
+
+    def __init__(self, base_url: str, api_key: Optional[str], account_id: Optional[str],
+                 max_concurrency: int, requests_per_minute: float):
+        super().__init__(base_url, api_key, max_concurrency, requests_per_minute)
+        self.account_id = account_id
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    def requests_for(self, pairs: List[str]) -> List[ProviderRequest]:
+        path = f"/v3/accounts/{self.account_id}/pricing"
+        requests = []
+        for start in range(0, len(pairs), self.max_instruments_per_request):
+            chunk = tuple(sorted(pairs[start:start + self.max_instruments_per_request]))
+            instruments = ",".join("_".join(split_pair(pair)) for pair in chunk)
+            requests.append(ProviderRequest(path, (("instruments", instruments),), chunk))
+        return requests
+
+    def parse(self, request: ProviderRequest, payload: dict) -> List[Quote]:
+        if "prices" not in payload:
+            raise ProviderError(payload.get("errorMessage", "Unexpected OANDA response"))
+
+        quotes = []
+        for price in payload["prices"]:
+            if not price.get("bids") or not price.get("asks"):
+                continue
+            quotes.append(Quote(
+                price["instrument"].replace("_", ""),
+                float(price["bids"][0]["price"]),
+                float(price["asks"][0]["price"]),
+                _parse_time(price["time"]),
+                self.name
+            ))
+        return quotes
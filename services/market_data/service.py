@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import random
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+import httpx
+from core import metrics
+from core.config import settings
+from services.market_data.limits import TokenBucket
+from services.market_data.providers import (
+    AlphaVantageProvider, OandaProvider, Provider, ProviderError, ProviderRateLimited, ProviderRequest, Quote
+)
+
+logger = logging.getLogger(__name__)
+
+metrics.registry.describe("market_data_requests_total", "counter", "Provider HTTP requests by outcome.")
+metrics.registry.describe("market_data_coalesced_total", "counter", "Quote requests served by an identical in-flight request.")
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def create_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """The pooled client shared by every provider."""
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(settings.MARKET_DATA_HTTP_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.MARKET_DATA_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.MARKET_DATA_HTTP_MAX_CONNECTIONS
+        ),
+        headers={"Accept": "application/json"}
+    )
+
+
+def create_providers() -> List[Provider]:
+    """Providers configured from settings."""
+    return [
+        AlphaVantageProvider(
+            settings.ALPHA_VANTAGE_BASE_URL,
+            settings.ALPHA_VANTAGE_API_KEY,
+            max_concurrency=settings.ALPHA_VANTAGE_MAX_CONCURRENCY,
+            requests_per_minute=settings.ALPHA_VANTAGE_REQUESTS_PER_MINUTE
+        ),
+        OandaProvider(
+            settings.OANDA_BASE_URL,
+            settings.OANDA_API_KEY,
+            settings.OANDA_ACCOUNT_ID,
+            max_concurrency=settings.OANDA_MAX_CONCURRENCY,
+            requests_per_minute=settings.OANDA_REQUESTS_PER_MINUTE
+        ),
+    ]
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class MarketDataService:
+    """Fetch quotes from providers through one pooled HTTP client.
+
+    Each provider gets its own concurrency limit and token-bucket request
+    budget. Identical requests already in flight are shared rather than
+    sent twice, and failed requests are retried with exponential backoff and
+    full jitter, honouring Retry-After when the provider sends one.
+    """
+
+    def __init__(
+            self,
+            providers: Iterable[Provider],
+            client: Optional[httpx.AsyncClient] = None,
+            max_retries: Optional[int] = None,
+            backoff_base: Optional[float] = None,
+            backoff_max: Optional[float] = None
+    ):
+        self.providers: Dict[str, Provider] = {provider.name: provider for provider in providers}
+        self.max_retries = settings.MARKET_DATA_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = settings.MARKET_DATA_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = settings.MARKET_DATA_BACKOFF_MAX if backoff_max is None else backoff_max
+        self._client = client
+        self._semaphores = {name: asyncio.Semaphore(p.max_concurrency) for name, p in self.providers.items()}
+        # No burst allowance: a burst on top of the steady rate would overrun per-minute quotas
+        self._buckets = {
+            name: TokenBucket(rate=p.requests_per_minute / 60, capacity=1)
+            for name, p in self.providers.items()
+        }
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self.latest: Dict[str, Quote] = {}
+        self.stats: Counter = Counter()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = create_http_client()
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _count(self, provider: Provider, outcome: str) -> None:
+        self.stats[outcome] += 1
+        metrics.registry.inc("market_data_requests_total", {"provider": provider.name, "outcome": outcome})
+
+    async def fetch_quotes(self, provider_name: str, pairs: List[str]) -> List[Quote]:
+        """Fetch current quotes for ``pairs``; pairs whose request failed are left out."""
+        provider = self.providers[provider_name]
+        requests = provider.requests_for(pairs)
+        results = await asyncio.gather(
+            *[self._coalesced(provider, request) for request in requests],
+            return_exceptions=True
+        )
+
+        quotes = []
+        for request, result in zip(requests, results):
+            if isinstance(result, BaseException):
+                logger.warning(
+                    "Quote request to %s failed for %s: %s", provider.name, ",".join(request.pairs), result
+                )
+                continue
+            quotes.extend(result)
+
+        for quote in quotes:
+            self.latest[quote.pair] = quote
+        return quotes
+
+    async def _coalesced(self, provider: Provider, request: ProviderRequest) -> List[Quote]:
+        key = (provider.name, request.key)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(provider, request))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._in_flight.pop(key, None) if self._in_flight.get(key) is done else None)
+        else:
+            self.stats["coalesced"] += 1
+            metrics.registry.inc("market_data_coalesced_total", {"provider": provider.name})
+        # Shield so one cancelled waiter does not cancel the request for everyone else
+        return await asyncio.shield(task)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _fetch(self, provider: Provider, request: ProviderRequest) -> List[Quote]:
+        bucket = self._buckets[provider.name]
+        attempt = 0
+        while True:
+            async with self._semaphores[provider.name]:
+                await bucket.acquire()
+                try:
+                    response = await self.client.get(
+                        provider.base_url + request.path, params=request.params, headers=provider.headers
+                    )
+                    if response.status_code == 429:
+                        raise ProviderRateLimited("HTTP 429", _retry_after(response))
+                    if response.status_code not in RETRYABLE_STATUS:
+                        if response.status_code >= 400:
+                            self._count(provider, "error")
+                            raise ProviderError(f"HTTP {response.status_code}: {response.text[:200]}")
+                        quotes = provider.parse(request, response.json())
+                        self._count(provider, "ok")
+                        return quotes
+                    self._count(provider, "retry")
+                    delay = self._backoff(attempt)
+                except ProviderRateLimited as e:
+                    self._count(provider, "rate_limited")
+                    delay = max(e.retry_after or 0, self._backoff(attempt))
+                    # Slow every caller of this provider down, not just this request
+                    bucket.penalize(delay)
+                except httpx.TransportError:
+                    self._count(provider, "retry")
+                    delay = self._backoff(attempt)
+
+            attempt += 1
+            if attempt > self.max_retries:
+                self._count(provider, "error")
+                raise ProviderError(f"{provider.name}: giving up after {attempt} attempts")
+            await asyncio.sleep(delay)
+
+
+market_data_service = MarketDataService(create_providers())
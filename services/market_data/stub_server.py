@@ -0,0 +1,141 @@
+"""Local stand-in for the Alpha Vantage and OANDA quote endpoints.
+
+Serves random-walk prices in each provider's response format and enforces
+per-provider quotas, so ingestion can be exercised offline:
+
+    python -m services.market_data.stub_server --port 9100
+    ALPHA_VANTAGE_BASE_URL=http://127.0.0.1:9100 OANDA_BASE_URL=http://127.0.0.1:9100 ...
+
+In-process use: ``httpx.ASGITransport(app=create_stub_app())``.
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+from services.market_data.pairs import ALL_PAIRS
+
+BASE_PRICES = {
+    "EUR": 1.08, "GBP": 1.27, "AUD": 0.66, "NZD": 0.61, "USD": 1.0,
+    "CAD": 1 / 1.36, "CHF": 1 / 0.88, "JPY": 1 / 150.0,
+}
+
+
+class QuotaWindow:
+    """Sliding one-minute request counter."""
+
+    def __init__(self, requests_per_minute: Optional[int]):
+        self.requests_per_minute = requests_per_minute
+        self._hits: Deque[float] = deque()
+
+    def allow(self) -> bool:
+        if not self.requests_per_minute:
+            return True
+        now = time.monotonic()
+        while self._hits and self._hits[0] <= now - 60:
+            self._hits.popleft()
+        if len(self._hits) >= self.requests_per_minute:
+            return False
+        self._hits.append(now)
+        return True
+
+
+def create_stub_app(
+        alpha_vantage_rpm: Optional[int] = 75,
+        oanda_rpm: Optional[int] = 7200,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+) -> FastAPI:
+    """Build the stub; ``stats`` on ``app.state`` counts served and rejected requests."""
+    rng = random.Random(seed)
+    app = FastAPI(title="Market data stub")
+    app.state.stats = Counter()
+    quotas = {"alpha_vantage": QuotaWindow(alpha_vantage_rpm), "oanda": QuotaWindow(oanda_rpm)}
+    prices: Dict[str, float] = {pair: BASE_PRICES[pair[:3]] / BASE_PRICES[pair[3:]] for pair in ALL_PAIRS}
+
+    def tick(pair: str) -> tuple:
+        mid = prices.setdefault(pair, 1.0) * (1 + rng.gauss(0, 0.0002))
+        prices[pair] = mid
+        spread = mid * 0.00005
+        return mid - spread, mid + spread
+
+    async def gate(provider: str) -> Optional[JSONResponse]:
+        if latency:
+            await asyncio.sleep(latency)
+        if not quotas[provider].allow():
+            app.state.stats[f"{provider}_rejected"] += 1
+            return JSONResponse({"errorMessage": "Rate limit exceeded"}, status_code=429, headers={"Retry-After": "1"})
+        if error_rate and rng.random() < error_rate:
+            app.state.stats[f"{provider}_errors"] += 1
+            return JSONResponse({"errorMessage": "Injected failure"}, status_code=503)
+        app.state.stats[f"{provider}_served"] += 1
+        return None
+
+    @app.get("/query")
+    async def alpha_vantage_quote(
+            function: str,
+            from_currency: str,
+            to_currency: str,
+            apikey: str = ""
+    ):
+        rejected = await gate("alpha_vantage")
+        if rejected is not None:
+            # Alpha Vantage reports quota errors as HTTP 200 with a note
+            return {"Note": "Thank you for using Alpha Vantage! Our standard API rate limit is exceeded."}
+        bid, ask = tick(from_currency + to_currency)
+        return {
+            "Realtime Currency Exchange Rate": {
+                "1. From_Currency Code": from_currency,
+                "3. To_Currency Code": to_currency,
+                "5. Exchange Rate": f"{(bid + ask) / 2:.6f}",
+                "6. Last Refreshed": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                "7. Time Zone": "UTC",
+                "8. Bid Price": f"{bid:.6f}",
+                "9. Ask Price": f"{ask:.6f}",
+            }
+        }
+
+    @app.get("/v3/accounts/{account_id}/pricing")
+    async def oanda_pricing(account_id: str, instruments: str = Query(...)):
+        rejected = await gate("oanda")
+        if rejected is not None:
+            return rejected
+        now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        prices_out = []
+        for instrument in instruments.split(","):
+            bid, ask = tick(instrument.replace("_", ""))
+            prices_out.append({
+                "instrument": instrument,
+                "time": now,
+                "bids": [{"price": f"{bid:.6f}", "liquidity": 1000000}],
+                "asks": [{"price": f"{ask:.6f}", "liquidity": 1000000}],
+                "tradeable": True,
+            })
+        return {"prices": prices_out, "time": now}
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--alpha-vantage-rpm", type=int, default=75)
+    parser.add_argument("--oanda-rpm", type=int, default=7200)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    app = create_stub_app(args.alpha_vantage_rpm, args.oanda_rpm, args.latency, args.error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import logging
+from typing import Optional, Tuple
+import numpy as np
+from services.analytics import indicators
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever build_features changes; cached and coalesced predictions are keyed on it
+FEATURES_VERSION = "v1"
+
+FEATURE_NAMES = ("return_1", "return_5", "return_20", "rsi", "macd_histogram", "volatility")
+
+# Closed bars needed per pair, including indicator warm-up
+HISTORY_BARS = indicators.warmup_bars(("macd", "rsi", "volatility")) + 21
+
+
+def build_features(close: np.ndarray) -> np.ndarray:
+    """Describe the last bar of each (pairs, HISTORY_BARS) close series as one feature row."""
+    log_close = np.log(close)
+    latest = close[:, -1]
+    return np.column_stack([
+        log_close[:, -1] - log_close[:, -2],
+        log_close[:, -1] - log_close[:, -6],
+        log_close[:, -1] - log_close[:, -21],
+        indicators.rsi(close)[:, -1] / 100.0 - 0.5,
+        indicators.macd(close)["histogram"][:, -1] / latest,
+        indicators.volatility(close)[:, -1],
+    ])
+
+
+class LinearModel:
+    """Expected log return over ``h`` bars as a linear function of the features.
+
+    ``weights`` is (max_horizon, features) and ``bias`` is (max_horizon,);
+    row h-1 serves horizon h. The uncertainty of each prediction is the
+    current per-bar volatility scaled by sqrt(h).
+    """
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, version: str = "baseline"):
+        if weights.shape[1] != len(FEATURE_NAMES) or bias.shape != weights.shape[:1]:
+            raise ValueError("model weights do not match the feature set")
+        self.weights = weights
+        self.bias = bias
+        self.version = version
+
+    @property
+    def max_horizon(self) -> int:
+        return len(self.weights)
+
+    @classmethod
+    def baseline(cls, max_horizon: int) -> "LinearModel":
+        """Short-term mean reversion with MACD momentum, used until a trained model is configured."""
+        per_bar = np.array([-0.05, -0.02, 0.01, -0.0004, 0.2, 0.0])
+        horizons = np.arange(1, max_horizon + 1, dtype=np.float64)
+        # The effects add up over longer horizons, but less than linearly
+        weights = per_bar * np.sqrt(horizons)[:, None]
+        return cls(weights, np.zeros(max_horizon))
+
+    @classmethod
+    def load(cls, path: str) -> "LinearModel":
+        """Load ``weights``, ``bias`` and an optional ``version`` from an .npz file."""
+        with np.load(path) as data:
+            version = str(data["version"]) if "version" in data else path
+            return cls(data["weights"], data["bias"], version)
+
+    def predict(self, features: np.ndarray, horizons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Expected log returns and their standard errors for a batch of (features, horizon) rows."""
+        rows = horizons - 1
+        expected = np.einsum("ij,ij->i", features, self.weights[rows]) + self.bias[rows]
+        stderr = features[:, FEATURE_NAMES.index("volatility")] * np.sqrt(horizons)
+        return expected, stderr
+
+
+def load_model(path: Optional[str], max_horizon: int, allow_baseline: bool = False) -> Optional[LinearModel]:
+    """The trained model at ``path``; otherwise the baseline if allowed, else None."""
+    if path:
+        model = LinearModel.load(path)
+        logger.info("Loaded prediction model %s", model.version)
+        return model
+    if allow_baseline:
+        logger.warning("No prediction model configured; serving the untrained baseline")
+        return LinearModel.baseline(max_horizon)
+    return None
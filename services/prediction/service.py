@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import math
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+import numpy as np
+from core import metrics
+from core.config import settings
+from services.analytics.prices import load_prices
+from services.market_data.candles import TIMEFRAMES, CandleStore, candle_store
+from services.prediction.model import FEATURES_VERSION, HISTORY_BARS, LinearModel, build_features, load_model
+
+logger = logging.getLogger(__name__)
+
+metrics.registry.describe("prediction_requests_total", "counter", "Prediction requests by how they were served.")
+metrics.registry.describe("prediction_batches_total", "counter", "Model invocations.")
+metrics.registry.describe("prediction_batch_rows_total", "counter", "Distinct predictions requested from the model.")
+
+# Two-sided 95% interval
+INTERVAL_Z = 1.96
+
+PredictionKey = Tuple[str, int, str, int]  # (pair, horizon, features version, closed before)
+
+
+class Prediction(NamedTuple):
+    pair: str
+    horizon: int
+    timeframe: str
+    features_version: str
+    model_version: str
+    ts: int  # open time of the last closed bar used
+    close: float
+    expected_return: float  # log return over the horizon
+    predicted_close: float
+    lower: float
+    upper: float
+
+
+class PredictionService:
+    """Serve model predictions in micro-batches.
+
+    Requests arriving within ``max_wait`` seconds of each other are queued
+    and run through the model together, once, on a worker thread, so a
+    burst at candle close costs a few model calls instead of one per
+    request. Identical requests share one queued or running prediction.
+    """
+
+    def __init__(
+            self,
+            store: CandleStore,
+            model: Optional[LinearModel],
+            timeframe: str,
+            max_batch_size: int,
+            max_wait: float,
+            workers: int
+    ):
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unknown timeframe {timeframe}")
+        self.store = store
+        self.model = model
+        self.timeframe = timeframe
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.workers = workers
+        self._queued: Dict[PredictionKey, asyncio.Future] = {}
+        self._running: Dict[PredictionKey, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats: Counter = Counter()
+
+    @property
+    def available(self) -> bool:
+        """Whether a model is configured; predictions are refused otherwise."""
+        return self.model is not None
+
+    @property
+    def max_horizon(self) -> int:
+        return self.model.max_horizon if self.model is not None else 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prediction")
+        return self._executor
+
+    def _count(self, outcome: str) -> None:
+        self.stats[outcome] += 1
+        metrics.registry.inc("prediction_requests_total", {"outcome": outcome})
+
+    async def predict(self, pair: str, horizon: int) -> Optional[Prediction]:
+        """Predict ``pair`` ``horizon`` bars ahead; None if there is not enough history."""
+        if self.model is None:
+            raise RuntimeError("No prediction model is configured")
+        if not 1 <= horizon <= self.max_horizon:
+            raise ValueError(f"horizon must be between 1 and {self.max_horizon}")
+
+        # Requests either side of a bar close need different history, so never share a prediction
+        key = (pair, horizon, FEATURES_VERSION, self._closed_before())
+        future = self._queued.get(key) or self._running.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._queued[key] = future
+            self._count("computed")
+            if len(self._queued) >= self.max_batch_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._dispatch)
+        else:
+            self._count("coalesced")
+        # Shield so one cancelled waiter does not cancel the prediction for everyone else
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._queued:
+            return
+        batch, self._queued = self._queued, {}
+        self._running.update(batch)
+        task = asyncio.ensure_future(self._run(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch: Dict[PredictionKey, asyncio.Future]) -> None:
+        metrics.registry.inc("prediction_batches_total")
+        metrics.registry.inc("prediction_batch_rows_total", value=len(batch))
+        self.stats["batches"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self._get_executor(), self.predict_batch, list(batch))
+        except Exception as e:
+            logger.exception("Prediction batch of %d failed", len(batch))
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(results.get(key))
+        finally:
+            for key, future in batch.items():
+                # Only left unresolved when the batch itself was cancelled, e.g. at shutdown
+                if not future.done():
+                    future.cancel()
+                if self._running.get(key) is future:
+                    del self._running[key]
+
+    def _closed_before(self) -> int:
+        seconds = TIMEFRAMES[self.timeframe]
+        return int(time.time()) // seconds * seconds
+
+    def _history(self, pairs: List[str], end: int) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """The last HISTORY_BARS bars before ``end`` of each pair that has that many."""
+        available, last_ts, closes = [], [], []
+        for pair in pairs:
+            # One pair at a time, so a pair's prediction never depends on what it was batched with
+            prices = load_prices(self.store, [pair], self.timeframe, HISTORY_BARS, end=end)
+            if prices.ts.size == HISTORY_BARS:
+                available.append(pair)
+                last_ts.append(prices.ts[-1])
+                closes.append(prices.close[0])
+        return available, np.array(last_ts, dtype=np.int64), np.array(closes, dtype=np.float64)
+
+    def predict_batch(self, keys: List[PredictionKey]) -> Dict[PredictionKey, Prediction]:
+        """Run the model for ``keys``; blocking, so it runs on the worker pool.
+
+        Keys are grouped by the bar they were requested after, which is
+        almost always one group. Within a group features are built once per
+        distinct pair, then every (pair, horizon) row goes through the model
+        in one vectorized call.
+        """
+        by_end: Dict[int, List[PredictionKey]] = {}
+        for key in keys:
+            by_end.setdefault(key[3], []).append(key)
+        results = {}
+        for end, group in by_end.items():
+            results.update(self._predict_closed(group, end))
+        return results
+
+    def _predict_closed(self, keys: List[PredictionKey], end: int) -> Dict[PredictionKey, Prediction]:
+        pairs, last_ts, closes = self._history(sorted({key[0] for key in keys}), end)
+        if not pairs:
+            return {}
+
+        features = build_features(closes)
+        row_of = {pair: row for row, pair in enumerate(pairs)}
+        keys = [key for key in keys if key[0] in row_of]
+        rows = np.array([row_of[key[0]] for key in keys], dtype=np.intp)
+        horizons = np.array([key[1] for key in keys], dtype=np.intp)
+        expected, stderr = self.model.predict(features[rows], horizons)
+
+        results = {}
+        for i, key in enumerate(keys):
+            close = float(closes[rows[i], -1])
+            mean, spread = float(expected[i]), INTERVAL_Z * float(stderr[i])
+            results[key] = Prediction(
+                pair=key[0],
+                horizon=key[1],
+                timeframe=self.timeframe,
+                features_version=key[2],
+                model_version=self.model.version,
+                ts=int(last_ts[rows[i]]),
+                close=close,
+                expected_return=mean,
+                predicted_close=close * math.exp(mean),
+                lower=close * math.exp(mean - spread),
+                upper=close * math.exp(mean + spread),
+            )
+        return results
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, waiting for running batches to finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+prediction_service = PredictionService(
+    candle_store,
+    load_model(settings.PREDICTION_MODEL_PATH, settings.PREDICTION_MAX_HORIZON, settings.PREDICTION_ALLOW_BASELINE),
+    settings.PREDICTION_TIMEFRAME,
+    settings.PREDICTION_MAX_BATCH_SIZE,
+    settings.PREDICTION_MAX_WAIT,
+    settings.PREDICTION_WORKERS
+)
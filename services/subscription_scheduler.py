@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import and_, bindparam, or_, select, update
+from core import metrics
+from core.cache import principal_invalidator
+from core.config import settings
+from core.database import AsyncSessionLocal, record_write
+from models.user import User, UserSubscription, UserTier, SubscriptionStatus
+from services.lease import DatabaseLease
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "subscription-sweep"
+
+
+class SubscriptionScheduler:
+    """Periodically renew or expire subscriptions whose end_date has passed.
+
+    Due rows are walked in (end_date, id) order with keyset pagination and
+    each batch is handled in its own transaction with bulk statements. A
+    database lease makes sure only one worker sweeps at a time.
+    """
+
+    def __init__(self, interval: float, batch_size: int, lease_ttl: float, renewal_days: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.lease = DatabaseLease(LEASE_NAME, lease_ttl)
+        self.renewal_period = timedelta(days=renewal_days)
+        self._task: Optional[asyncio.Task] = None
+
+    async def _process_batch(self, now: datetime, after: Optional[tuple]) -> Optional[Tuple[tuple, int, int]]:
+        """Renew or expire one batch of due subscriptions.
+
+        Returns the last (end_date, id) key seen with the renewed and expired
+        counts, or None when nothing is left.
+        """
+        stmt = (
+            select(
+                UserSubscription.id, UserSubscription.user_id, UserSubscription.end_date,
+                UserSubscription.auto_renew, UserSubscription.version
+            )
+            .where(UserSubscription.status == SubscriptionStatus.ACTIVE, UserSubscription.end_date <= now)
+            .order_by(UserSubscription.end_date, UserSubscription.id)
+            .limit(self.batch_size)
+        )
+        if after is not None:
+            last_end_date, last_id = after
+            stmt = stmt.where(or_(
+                UserSubscription.end_date > last_end_date,
+                and_(UserSubscription.end_date == last_end_date, UserSubscription.id > last_id)
+            ))
+
+        async with AsyncSessionLocal() as session:
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                return None
+
+            renewals = []
+            expired_ids = []
+            expired_user_ids = []
+            for subscription_id, user_id, end_date, auto_renew, version in rows:
+                if auto_renew:
+                    new_end_date = end_date + self.renewal_period
+                    if new_end_date <= now:
+                        # Missed several periods (e.g. the scheduler was down); restart from now
+                        new_end_date = now + self.renewal_period
+                    renewals.append({"b_id": subscription_id, "b_version": version, "b_end_date": new_end_date})
+                else:
+                    expired_ids.append(subscription_id)
+                    expired_user_ids.append(user_id)
+
+            renewed = 0
+            if renewals:
+                # Only rows unchanged since they were read: a subscription cancelled or
+                # edited meanwhile keeps its end_date, and version is bumped in SQL
+                subscriptions = UserSubscription.__table__
+                result = await session.execute(
+                    update(subscriptions)
+                    .where(
+                        subscriptions.c.id == bindparam("b_id"),
+                        subscriptions.c.status == SubscriptionStatus.ACTIVE,
+                        subscriptions.c.version == bindparam("b_version")
+                    )
+                    .values(end_date=bindparam("b_end_date"), version=subscriptions.c.version + 1),
+                    renewals
+                )
+                # Some drivers cannot count rows across an executemany
+                renewed = result.rowcount if result.supports_sane_multi_rowcount() else len(renewals)
+            expired = 0
+            if expired_ids:
+                # Re-check the row is still due: it may have been cancelled or
+                # renewed since it was read
+                result = await session.execute(
+                    update(UserSubscription)
+                    .where(
+                        UserSubscription.id.in_(expired_ids),
+                        UserSubscription.status == SubscriptionStatus.ACTIVE,
+                        UserSubscription.end_date <= now
+                    )
+                    .values(
+                        status=SubscriptionStatus.INACTIVE,
+                        active_user_id=None,
+                        version=UserSubscription.version + 1
+                    )
+                )
+                expired = result.rowcount
+                # Only users left without an active subscription drop to the free tier
+                still_active = (
+                    select(UserSubscription.id)
+                    .where(
+                        UserSubscription.user_id == User.id,
+                        UserSubscription.status == SubscriptionStatus.ACTIVE
+                    )
+                    .exists()
+                )
+                await session.execute(
+                    update(User)
+                    .where(User.id.in_(expired_user_ids), ~still_active)
+                    .values(tier=UserTier.FREE, version=User.version + 1)
+                )
+            await session.commit()
+
+        for user_id in expired_user_ids:
+            record_write(user_id)
+            principal_invalidator.invalidate(str(user_id))
+
+        metrics.registry.inc("subscription_sweep_batches_total")
+        metrics.registry.inc("subscription_sweep_rows_total", {"action": "renewed"}, renewed)
+        metrics.registry.inc("subscription_sweep_rows_total", {"action": "expired"}, expired)
+
+        last = rows[-1]
+        return (last.end_date, last.id), renewed, expired
+
+    async def sweep(self) -> dict:
+        """Run one full sweep if this worker holds the lease."""
+        if not await self.lease.acquire():
+            return {"renewed": 0, "expired": 0, "batches": 0, "skipped": True}
+
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        result = {"renewed": 0, "expired": 0, "batches": 0, "skipped": False}
+        after = None
+        while True:
+            processed = await self._process_batch(now, after)
+            if processed is None:
+                break
+            after, renewed, expired = processed
+            result["renewed"] += renewed
+            result["expired"] += expired
+            result["batches"] += 1
+            # Keep the lease alive through long sweeps; stop if another worker took it over
+            if not await self.lease.acquire():
+                logger.warning("Lost subscription sweep lease after %d batches", result["batches"])
+                break
+
+        elapsed = time.perf_counter() - start
+        metrics.registry.inc("subscription_sweep_seconds_total", value=elapsed)
+        if result["batches"]:
+            logger.info(
+                "Subscription sweep renewed %d and expired %d in %.1fms",
+                result["renewed"], result["expired"], elapsed * 1000,
+                extra={"duration_ms": round(elapsed * 1000, 3), "batches": result["batches"]}
+            )
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Subscription sweep failed; retrying next interval")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the periodic sweep."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sweeping and hand the lease to the next worker."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            with suppress(Exception):
+                await self.lease.release()
+
+
+subscription_scheduler = SubscriptionScheduler(
+    interval=settings.SUBSCRIPTION_SWEEP_INTERVAL,
+    batch_size=settings.SUBSCRIPTION_SWEEP_BATCH_SIZE,
+    lease_ttl=settings.SUBSCRIPTION_SWEEP_LEASE_TTL,
+    renewal_days=settings.SUBSCRIPTION_RENEWAL_DAYS
+)
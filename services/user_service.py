@@ -1,56 +1,149 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException, status
 from models.user import User, UserSubscription, UserTier, SubscriptionStatus
 from schemas.user import UserCreate, UserUpdate, SubscriptionCreate, SubscriptionUpdate
-from core.security import get_password_hash, verify_password
+from core.cache import principal_invalidator
+from core.config import settings
+from core.database import record_write, route_reads_for
+from core.security import password_hasher
+from services.write_behind import write_behind
 from datetime import datetime, timedelta
 import uuid
 
 
+def _as_uuid(value) -> uuid.UUID:
+    """Coerce a user id (token subjects and routes pass strings) to a UUID."""
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def _duplicate_user_detail(exc: IntegrityError) -> Optional[str]:
+    """Map a unique-constraint violation on users to its API error message."""
+    message = str(exc.orig)
+    if "users.email" in message or "ix_users_email" in message:
+        return "Email already registered"
+    if "users.username" in message or "ix_users_username" in message:
+        return "Username already taken"
+    return None
+
+
+def _new_user_row(user_data: UserCreate, password_hash: str) -> dict:
+    """Build a complete users row so nothing has to be read back after INSERT."""
+    return {
+        "id": uuid.uuid4(),
+        "email": user_data.email,
+        "username": user_data.username,
+        "password_hash": password_hash,
+        "first_name": user_data.first_name,
+        "last_name": user_data.last_name,
+        "tier": UserTier.FREE,
+        "is_active": True,
+        "email_verified": False,
+        "created_at": datetime.utcnow(),
+        "last_login": None,
+        "timezone": user_data.timezone,
+        "preferences": {},
+    }
+
+
 class UserService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
     async def create_user(self, user_data: UserCreate) -> User:
         """Create a new user."""
-        # Check if user already exists
-        stmt = select(User).where(
-            (User.email == user_data.email) | (User.username == user_data.username)
-        )
-        result = await self.db.execute(stmt)
-        existing_user = result.scalars().first()
-
-        if existing_user:
-            if existing_user.email == user_data.email:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already registered"
-                )
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Username already taken"
-                )
-
-        # Create new user
-        user = User(
-            email=user_data.email,
-            username=user_data.username,
-            password_hash=get_password_hash(user_data.password),
-            first_name=user_data.first_name,
-            last_name=user_data.last_name,
-            timezone=user_data.timezone
-        )
+        password_hash = await password_hasher.hash(user_data.password)
+        user = User(**_new_user_row(user_data, password_hash))
 
+        # The unique constraints on email and username decide duplicates
         self.db.add(user)
-        await self.db.commit()
-        await self.db.refresh(user)
+        try:
+            await self.db.commit()
+        except IntegrityError as e:
+            await self.db.rollback()
+            detail = _duplicate_user_detail(e)
+            if detail is None:
+                raise
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=detail
+            )
 
+        record_write(user.id)
         return user
 
+    async def bulk_create_users(self, users: List[UserCreate]) -> List[dict]:
+        """Create many users with one batched INSERT, returning a result per row."""
+        results: List[Optional[dict]] = [None] * len(users)
+        taken_emails, taken_usernames = await self._existing_identities(users)
+
+        # Reject duplicates against existing users and earlier rows in the batch
+        pending: List[int] = []
+        for index, user_data in enumerate(users):
+            if user_data.email in taken_emails:
+                results[index] = self._bulk_result(index, user_data, detail="Email already registered")
+            elif user_data.username in taken_usernames:
+                results[index] = self._bulk_result(index, user_data, detail="Username already taken")
+            else:
+                taken_emails.add(user_data.email)
+                taken_usernames.add(user_data.username)
+                pending.append(index)
+
+        hashes = await password_hasher.hash_many([users[index].password for index in pending])
+        rows = [_new_user_row(users[index], password_hash) for index, password_hash in zip(pending, hashes)]
+
+        if rows:
+            try:
+                await self.db.execute(insert(User), rows)
+                await self.db.commit()
+                for index, row in zip(pending, rows):
+                    results[index] = self._bulk_result(index, users[index], user_id=row["id"])
+            except IntegrityError:
+                # A concurrent registration took a name; fall back to one row per transaction
+                await self.db.rollback()
+                for index, row in zip(pending, rows):
+                    try:
+                        await self.db.execute(insert(User), [row])
+                        await self.db.commit()
+                        results[index] = self._bulk_result(index, users[index], user_id=row["id"])
+                    except IntegrityError as e:
+                        await self.db.rollback()
+                        detail = _duplicate_user_detail(e) or "User could not be created"
+                        results[index] = self._bulk_result(index, users[index], detail=detail)
+
+        return results
+
+    async def _existing_identities(self, users: List[UserCreate]) -> Tuple[set, set]:
+        """Get the emails and usernames from users that are already registered."""
+        emails: set = set()
+        usernames: set = set()
+        chunk_size = 1000
+        for start in range(0, len(users), chunk_size):
+            chunk = users[start:start + chunk_size]
+            stmt = select(User.email, User.username).where(or_(
+                User.email.in_([user_data.email for user_data in chunk]),
+                User.username.in_([user_data.username for user_data in chunk])
+            ))
+            for email, username in (await self.db.execute(stmt)).all():
+                emails.add(email)
+                usernames.add(username)
+        return emails, usernames
+
+    @staticmethod
+    def _bulk_result(index: int, user_data: UserCreate, user_id: Optional[uuid.UUID] = None,
+                     detail: Optional[str] = None) -> dict:
+        return {
+            "index": index,
+            "email": user_data.email,
+            "status": "created" if detail is None else "error",
+            "id": user_id,
+            "detail": detail,
+        }
+
     async def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user by email and password."""
         stmt = select(User).where(User.email == email)
@@ -60,21 +153,24 @@ class UserService:
         if not user:
             return None
 
-        if not verify_password(password, user.password_hash):
+        if not await password_hasher.verify(password, user.password_hash):
             return None
 
         if not user.is_active:
             return None
 
-        # Update last login
-        user.last_login = datetime.utcnow()
-        await self.db.commit()
+        # Update last login; the write is batched by the write-behind buffer
+        now = datetime.utcnow()
+        set_committed_value(user, "last_login", now)
+        write_behind.record_login(user.id, now)
+        principal_invalidator.invalidate(str(user.id))
 
         return user
 
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         """Get user by ID."""
-        stmt = select(User).where(User.id == user_id)
+        route_reads_for(self.db, user_id)
+        stmt = select(User).where(User.id == _as_uuid(user_id))
         result = await self.db.execute(stmt)
         return result.scalars().first()
 
@@ -86,7 +182,7 @@ class UserService:
 
     async def update_user(self, user_id: str, user_data: UserUpdate) -> User:
         """Update user information."""
-        stmt = select(User).where(User.id == user_id)
+        stmt = select(User).where(User.id == _as_uuid(user_id))
         result = await self.db.execute(stmt)
         user = result.scalars().first()
 
@@ -100,9 +196,29 @@ class UserService:
         update_data = user_data.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(user, field, value)
+        user.version = User.version + 1
 
         await self.db.commit()
         await self.db.refresh(user)
+        record_write(user.id)
+        principal_invalidator.invalidate(str(user.id))
+
+        return user
+
+    async def deactivate_user(self, user_id: str) -> User:
+        """Deactivate a user account."""
+        user = await self.get_user_by_id(user_id)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+
+        user.is_active = False
+        user.version = User.version + 1
+        await self.db.commit()
+        record_write(user.id)
+        principal_invalidator.invalidate(str(user.id))
 
         return user
 
@@ -118,18 +234,23 @@ class UserService:
 
         # Cancel existing active subscriptions
         stmt = update(UserSubscription).where(
-            UserSubscription.user_id == user_id,
+            UserSubscription.user_id == user.id,
             UserSubscription.status == SubscriptionStatus.ACTIVE
-        ).values(status=SubscriptionStatus.CANCELLED)
+        ).values(
+            status=SubscriptionStatus.CANCELLED,
+            active_user_id=None,
+            version=UserSubscription.version + 1
+        )
         await self.db.execute(stmt)
 
         # Create new subscription
-        end_date = datetime.utcnow() + timedelta(days=30)  # 30 days from now
+        end_date = datetime.utcnow() + timedelta(days=settings.SUBSCRIPTION_RENEWAL_DAYS)
 
         subscription = UserSubscription(
-            user_id=user_id,
+            user_id=user.id,
             tier=subscription_data.tier,
             status=SubscriptionStatus.ACTIVE,
+            active_user_id=user.id,
             end_date=end_date,
             auto_renew=subscription_data.auto_renew,
             payment_method_id=subscription_data.payment_method_id
@@ -137,23 +258,48 @@ class UserService:
 
         # Update user tier
         user.tier = subscription_data.tier
+        user.version = User.version + 1
 
         self.db.add(subscription)
-        await self.db.commit()
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # Another request activated a subscription for this user concurrently
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Subscription change already in progress"
+            )
         await self.db.refresh(subscription)
+        record_write(user.id)
+        principal_invalidator.invalidate(str(user.id))
 
         return subscription
 
     async def get_user_subscriptions(self, user_id: str) -> List[UserSubscription]:
         """Get all subscriptions for a user."""
-        stmt = select(UserSubscription).where(UserSubscription.user_id == user_id)
+        route_reads_for(self.db, user_id)
+        stmt = select(UserSubscription).where(UserSubscription.user_id == _as_uuid(user_id))
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
+    async def get_subscriptions_fingerprint(self, user_id: str) -> tuple:
+        """Summarize a user's subscriptions; it changes whenever any of them does."""
+        route_reads_for(self.db, user_id)
+        stmt = select(
+            func.count(UserSubscription.id),
+            func.coalesce(func.sum(UserSubscription.version), 0),
+            func.max(UserSubscription.created_at),
+            func.max(UserSubscription.updated_at)
+        ).where(UserSubscription.user_id == _as_uuid(user_id))
+        result = await self.db.execute(stmt)
+        return tuple(result.one())
+
     async def get_active_subscription(self, user_id: str) -> Optional[UserSubscription]:
         """Get active subscription for a user."""
+        route_reads_for(self.db, user_id)
         stmt = select(UserSubscription).where(
-            UserSubscription.user_id == user_id,
+            UserSubscription.user_id == _as_uuid(user_id),
             UserSubscription.status == SubscriptionStatus.ACTIVE
         )
         result = await self.db.execute(stmt)
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import uuid
+from contextlib import suppress
+from datetime import datetime
+from typing import Dict, Optional
+from sqlalchemy import bindparam, update
+from core.cache import principal_invalidator
+from core.config import settings
+from core.database import AsyncSessionLocal
+from models.user import User, UserAPIKey
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Coalesce last_login and API-key last_used stamps and flush them in batches.
+
+    Only the newest timestamp per row is kept, so a login storm for one user
+    becomes a single UPDATE per flush interval instead of a commit per login.
+    """
+
+    def __init__(self, interval: float, max_pending: int):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._last_login: Dict[uuid.UUID, datetime] = {}
+        self._flushing_logins: Dict[uuid.UUID, datetime] = {}
+        self._api_key_last_used: Dict[uuid.UUID, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Future] = None
+
+    def record_login(self, user_id: uuid.UUID, at: datetime) -> None:
+        """Queue a last_login update."""
+        self._last_login[user_id] = at
+        self._check_pressure()
+
+    def pending_login(self, user_id: uuid.UUID) -> Optional[datetime]:
+        """A last_login recorded here but not yet committed, if any."""
+        return self._last_login.get(user_id) or self._flushing_logins.get(user_id)
+
+    def record_api_key_use(self, api_key_id: uuid.UUID, at: datetime) -> None:
+        """Queue a last_used update."""
+        self._api_key_last_used[api_key_id] = at
+        self._check_pressure()
+
+    def _check_pressure(self) -> None:
+        if len(self._last_login) + len(self._api_key_last_used) >= self.max_pending:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Write all pending timestamps with one batched UPDATE per table."""
+        last_login, self._last_login = self._last_login, {}
+        self._flushing_logins = last_login
+        api_key_last_used, self._api_key_last_used = self._api_key_last_used, {}
+        if not last_login and not api_key_last_used:
+            return
+
+        # Core executemany rather than ORM bulk update: rows deleted since they
+        # were recorded simply match nothing instead of raising StaleDataError
+        users = User.__table__
+        api_keys = UserAPIKey.__table__
+        try:
+            async with AsyncSessionLocal() as session:
+                if last_login:
+                    await session.execute(
+                        update(users)
+                        .where(users.c.id == bindparam("b_id"))
+                        .values(last_login=bindparam("b_at")),
+                        [{"b_id": user_id, "b_at": at} for user_id, at in last_login.items()]
+                    )
+                if api_key_last_used:
+                    # Keep updated_at as it is: APIKeyIndex.refresh reloads keys by
+                    # updated_at, and a usage stamp is not a change to the key
+                    await session.execute(
+                        update(api_keys)
+                        .where(api_keys.c.id == bindparam("b_id"))
+                        .values(last_used=bindparam("b_at"), updated_at=api_keys.c.updated_at),
+                        [{"b_id": key_id, "b_at": at} for key_id, at in api_key_last_used.items()]
+                    )
+                await session.commit()
+        except Exception:
+            # Put the batch back without overwriting anything newer recorded meanwhile
+            for user_id, at in last_login.items():
+                self._last_login.setdefault(user_id, at)
+            for key_id, at in api_key_last_used.items():
+                self._api_key_last_used.setdefault(key_id, at)
+            raise
+        finally:
+            self._flushing_logins = {}
+
+        # Principals cached before the commit, on any worker, still hold the old last_login
+        for user_id in last_login:
+            principal_invalidator.invalidate(str(user_id))
+
+    async def _run(self) -> None:
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            self._wakeup.clear()
+            # Shielded so stop() cannot interrupt a flush halfway and lose its batch
+            self._flushing = asyncio.ensure_future(self.flush())
+            try:
+                await asyncio.shield(self._flushing)
+            except Exception:
+                logger.exception("Write-behind flush failed; retrying next interval")
+
+    def start(self) -> None:
+        """Start the periodic flusher."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write everything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._flushing is not None:
+            # A failed in-flight flush re-queued its batch for the final flush below
+            with suppress(Exception):
+                await self._flushing
+            self._flushing = None
+        await self.flush()
+
+    @property
+    def pending(self) -> int:
+        return len(self._last_login) + len(self._api_key_last_used)
+
+
+write_behind = WriteBehindBuffer(
+    interval=settings.WRITE_BEHIND_FLUSH_INTERVAL,
+    max_pending=settings.WRITE_BEHIND_MAX_PENDING
+)